@@ -4,42 +4,81 @@ bus with the Raspberry Pi. A clone from https://github.com/kamerozdmr/PiADXL355
 changing some definitions to fit my purposes. Thanks!
 """
 
-import spidev
 import time
-import RPi.GPIO as GPIO
+import numpy as np
 from .ADXL357_definitions import *
+from .ADXL357_backend import SpidevBackend
+from .ADXL357_decoder import decode_raw, decode_g
 
 class ADXL357():
-    def __init__(self):
-        # SPI init
-        self.spi = spidev.SpiDev()
-        self.spi.open(SPI_BUS, SPI_DEVICE)
-        self.spi.max_speed_hz = SPI_MAX_CLOCK_HZ
-        self.spi.mode = SPI_MODE
-
-        GPIO.setmode(GPIO.BOARD)                  # Use physical pin numbers
-        self.drdy_pin = DRDY_PIN                # Define Data Ready pin
+    def __init__(self, backend=None, output_range=40, sampling_rate=4000, hpass_corner=0,
+                 offsets=None, fifo_watermark=None,
+                 bus=SPI_BUS, device=SPI_DEVICE, drdy_pin=DRDY_PIN, fifo_int_pin=FIFO_INT_PIN):
+        # SPI and GPIO access, spidev/RPi.GPIO unless a backend (e.g. ADXL357Simulator) is given
+        self.backend = backend if backend is not None else SpidevBackend(bus, device)
+        self.bus = bus
+        self.device = device
+
+        self.drdy_pin = drdy_pin                # Define Data Ready pin
         self.drdy_delay = DRDY_DELAY            # Define Data Ready delay
         self.drdy_timeout = DRDY_TIMEOUT        # Define Data Ready timeout
+        self.drdy_mode = DRDY_MODE              # Define Data Ready wait mode
+        self.drdy_missed = 0                    # Samples skipped between two DRDY waits
+        self.drdy_timeouts = 0                  # DRDY waits that timed out
+        self.drdy_last = None                   # Time of the last DRDY, reset on start()
+        self.odr = None
+        self.output_range = None
+        self.hpass_corner = None
         
         if self.drdy_pin is not None:
-            GPIO.setup(self.drdy_pin, GPIO.IN)
-        
-        # Default device parameters
-        RANGE = 40
-        ODR   = 4000
-        HPFC  = 0
+            self.backend.setup_pin(self.drdy_pin)
+
+        self.fifo_int_pin = fifo_int_pin        # Define FIFO watermark pin
+        if self.fifo_int_pin is not None:
+            self.backend.setup_pin(self.fifo_int_pin)
+        self.fifo_partial = b''                 # Incomplete x, y, z set left over from the last drain
         
         # Device init
-        self.transfer = self.spi.xfer2
-        self.setrange(RANGE)                    # Set default measurement range
-        self.setfilter(ODR, HPFC)               # Set default ODR and filter props
-        self.wait_drdy()
+        self.transfer = self.backend.transfer
+        self.shadow = {}                        # Last known value of each CONFIG_REGISTERS entry
+        self.shadow_enabled = True              # False always goes to the device (no caching)
+        # Prebuilt command for the XDATA3..ZDATA1 burst read
+        self.burst_cmd = [(REG_XDATA3 << 1) | 0b1] + [0x00] * AXIS_BURST_LENGTH
+        self.configure(output_range, sampling_rate, hpass_corner, offsets, fifo_watermark)
 
-        self.factor = RANGE_TO_SENSITIVITY[RANGE]   # Instrument factor raw to g [not accurate]
-        
-        self.offsets = {'x': 0.0, 'y': 0.0, 'z': 0.0}
-        self.reset_offsets()
+    def configure(self, output_range=40, sampling_rate=4000, hpass_corner=0,
+                  offsets=None, fifo_watermark=None):
+        """Soft reset, write the whole configuration in one standby window and start measuring.
+        offsets are software offsets in g (as returned by calibrate), the offset registers stay 0."""
+        self.write(REG_RESET, RESET_CODE)
+        time.sleep(RESET_DELAY)
+        self.shadow = {r: RESET_VALUES.get(r, 0x00) for r in CONFIG_REGISTERS}
+        self.fifo_partial = b''
+
+        regs = dict(self.shadow)
+        regs[REG_FILTER] = (HPFC_TO_BIT[hpass_corner] << 4) | ODR_TO_BIT[sampling_rate]
+        regs[REG_RANGE] = (regs[REG_RANGE] & 0b11111100) | RANGE_TO_BIT[output_range]
+        if fifo_watermark is not None:
+            if not 0 < 3 * fifo_watermark <= FIFO_SIZE:
+                raise ValueError(f"FIFO watermark must be 1..{FIFO_SIZE // 3} samples")
+            regs[REG_FIFO_SAMPLES] = 3 * fifo_watermark
+            regs[REG_INT_MAP] = INT_FULL_EN1
+        regs[REG_POWER_CTL] = 0x00              # Measurement mode, written last
+        # FILTER..POWER_CTL are contiguous: one transfer, the device leaves standby on its last byte
+        self.write_block(REG_FILTER, [regs[r] for r in range(REG_FILTER, REG_POWER_CTL + 1)])
+
+        self.factor = 1 / RANGE_TO_SENSITIVITY[output_range]
+        self.odr = sampling_rate
+        self.output_range = output_range
+        self.hpass_corner = hpass_corner
+        self.offsets = dict(offsets) if offsets else {'x': 0.0, 'y': 0.0, 'z': 0.0}
+
+        time.sleep(TURN_ON_DELAY)
+        if self.drdy_pin is None:
+            time.sleep(1 / sampling_rate)       # No DRDY line, wait one sample period
+        else:
+            self.wait_drdy_level()
+        self.drdy_last = None
         
     def read(self, register, length=1):
         address = (register << 1) | 0b1
@@ -54,29 +93,119 @@ class ADXL357():
         # Shift register address 1 bit left, and set LSB to zero
         address = (register << 1) & 0b11111110
         result = self.transfer([address, value])
+        if register in CONFIG_REGISTERS:
+            self.shadow[register] = value
+        elif register == REG_RESET:
+            self.shadow.clear()
+
+    def write_block(self, register, values):
+        """Write consecutive registers in one transfer"""
+        address = (register << 1) & 0b11111110
+        self.transfer([address] + list(values))
+        for i, value in enumerate(values):
+            if register + i in CONFIG_REGISTERS:
+                self.shadow[register + i] = value
+
+    def read_config(self, register):
+        """Read a configuration register from the shadow cache, or the device if unknown"""
+        if self.shadow_enabled and register in self.shadow:
+            return self.shadow[register]
+        value = self.read(register)
+        self.shadow[register] = value
+        return value
+
+    def write_config(self, register, value):
+        """Write a configuration register, skipped if the cached value already matches.
+        Returns True if the device was written."""
+        if self.shadow_enabled and self.shadow.get(register) == value:
+            return False
+        self.write(register, value)
+        return True
+
+    def resync(self):
+        """Reload the shadow cache from the device"""
+        self.shadow.clear()
+        for register in CONFIG_REGISTERS:
+            self.shadow[register] = self.read(register)
+        return dict(self.shadow)
+
+    def verify(self):
+        """Compare the shadow cache with the device, returns {register: (cached, actual)} mismatches"""
+        mismatches = {}
+        for register, cached in self.shadow.items():
+            actual = self.read(register)
+            if actual != cached:
+                mismatches[register] = (cached, actual)
+        return mismatches
     
     def wait_drdy(self):
-        start = time.time()
-        elapsed = time.time() - start
-        # Wait DRDY pin to go low or DRDY_TIMEOUT seconds to pass
-        if self.drdy_pin is not None:
-            drdy_level = GPIO.input(self.drdy_pin)
-            while (drdy_level == GPIO.LOW) and (elapsed < self.drdy_timeout):
-                elapsed = time.time() - start
-                drdy_level = GPIO.input(self.drdy_pin)
-                # Delay in order to avoid busy wait and reduce CPU load.
-                time.sleep(self.drdy_delay)
-                #self.wait2go_low()
-            if elapsed >= self.drdy_timeout:
-                print("\nTimeout while polling DRDY pin")
-        else:
+        """Wait for new data and count samples skipped since the previous call"""
+        timeouts = self.drdy_timeouts
+        waited = self.wait_drdy_level()
+        if self.drdy_timeouts != timeouts:
+            self.drdy_last = None               # No data, nothing to count against
+            return
+        now = time.monotonic()
+        ready = now
+        if self.drdy_last is not None and self.odr:
+            if waited:
+                # DRDY just rose: whole periods since the previous sample
+                skipped = max(round((now - self.drdy_last) * self.odr) - 1, 0)
+            else:
+                # Data was already waiting: only lateness beyond a full period lost samples
+                late = now - self.drdy_last - 1 / self.odr
+                skipped = max(int(late * self.odr), 0)
+                ready = min(now, self.drdy_last + (1 + skipped) / self.odr)
+            self.drdy_missed += skipped
+        self.drdy_last = ready                  # Estimated time the sample became ready
+
+    def wait_drdy_level(self):
+        """Wait for DRDY high, returns False if data was already waiting"""
+        if self.drdy_pin is None:
             time.sleep(self.drdy_timeout)
             print("\nDRDY pin not connected")
+            return True
+        elif self.drdy_mode == 'edge':
+            return self.wait_drdy_edge()
+        else:
+            return self.wait_drdy_poll()
+
+    def wait_drdy_edge(self):
+        """Block on the DRDY rising edge, the GIL is released while waiting"""
+        if self.backend.input(self.drdy_pin) == PIN_HIGH:
+            return False                        # Data already waiting
+        try:
+            edge = self.backend.wait_for_edge(self.drdy_pin, self.drdy_timeout)
+        except RuntimeError as e:
+            print(f"\nEdge detection unavailable ({e}), falling back to polling DRDY pin")
+            self.drdy_mode = 'poll'
+            return self.wait_drdy_poll()
+        if not edge:
+            self.drdy_timeouts += 1
+            print("\nTimeout while waiting DRDY edge")
+        return True
+
+    def wait_drdy_poll(self):
+        start = time.time()
+        elapsed = time.time() - start
+        # Wait DRDY pin to go high or DRDY_TIMEOUT seconds to pass
+        drdy_level = self.backend.input(self.drdy_pin)
+        waited = drdy_level == PIN_LOW
+        while (drdy_level == PIN_LOW) and (elapsed < self.drdy_timeout):
+            elapsed = time.time() - start
+            drdy_level = self.backend.input(self.drdy_pin)
+            # Delay in order to avoid busy wait and reduce CPU load.
+            time.sleep(self.drdy_delay)
+            #self.wait2go_low()
+        if elapsed >= self.drdy_timeout:
+            self.drdy_timeouts += 1
+            print("\nTimeout while polling DRDY pin")
+        return waited
 
     def wait2go_low(self):
-        drdy_level = GPIO.input(self.drdy_pin)
-        while (drdy_level == GPIO.HIGH):
-            drdy_level = GPIO.input(self.drdy_pin)
+        drdy_level = self.backend.input(self.drdy_pin)
+        while (drdy_level == PIN_HIGH):
+            drdy_level = self.backend.input(self.drdy_pin)
             time.sleep(self.drdy_delay)
     
     def fifofull(self):
@@ -86,12 +215,13 @@ class ADXL357():
         return self.read(REG_STATUS) & 0b100
     
     def start(self):
-        tmp = self.read(REG_POWER_CTL)
-        self.write(REG_POWER_CTL, tmp & 0b0)
+        tmp = self.read_config(REG_POWER_CTL)
+        self.write_config(REG_POWER_CTL, tmp & 0b0)
+        self.drdy_last = None
 
     def stop(self):
-        tmp = self.read(REG_POWER_CTL)
-        self.write(REG_POWER_CTL, tmp | 0b1)  
+        tmp = self.read_config(REG_POWER_CTL)
+        self.write_config(REG_POWER_CTL, tmp | 0b1)  
     
     def conversion(self, value):
         if (0x80000 & value):
@@ -102,16 +232,24 @@ class ADXL357():
         return ret
     
     def setrange(self, r):
-        self.stop()
-        temp = self.read(REG_RANGE)
-        self.write(REG_RANGE, (temp & 0b11111100) | RANGE_TO_BIT[r])
+        temp = self.read_config(REG_RANGE)
+        self.set_config(REG_RANGE, (temp & 0b11111100) | RANGE_TO_BIT[r])
         self.factor = 1 / RANGE_TO_SENSITIVITY[r]  # Use sensitivity for scaling
+        self.output_range = r
         self.start()
 
     def setfilter(self, lpf, hpf):
-        self.stop()
-        self.write(REG_FILTER, (HPFC_TO_BIT[hpf] << 4) | ODR_TO_BIT[lpf])
+        self.set_config(REG_FILTER, (HPFC_TO_BIT[hpf] << 4) | ODR_TO_BIT[lpf])
+        self.odr = lpf
+        self.hpass_corner = hpf
         self.start()
+
+    def set_config(self, register, value):
+        """Write a register that needs standby mode, only leaving measurement mode if it changes"""
+        if self.shadow_enabled and self.shadow.get(register) == value:
+            return
+        self.stop()
+        self.write(register, value)
     
     def get_x_raw(self):
         datal = self.read(REG_XDATA3, 3)
@@ -140,6 +278,14 @@ class ADXL357():
         res = self.conversion(res)
         return res
 
+    def get_xyz_raw(self):
+        """Read all three axes in a single 9-byte SPI transfer"""
+        d = self.transfer(self.burst_cmd)
+        x = (d[1] << 12) | (d[2] << 4) | (d[3] >> 4)
+        y = (d[4] << 12) | (d[5] << 4) | (d[6] >> 4)
+        z = (d[7] << 12) | (d[8] << 4) | (d[9] >> 4)
+        return self.conversion(x), self.conversion(y), self.conversion(z)
+
     def get_x(self):
         return float(self.get_x_raw()) * self.factor
 
@@ -149,30 +295,98 @@ class ADXL357():
     def get_z(self):
         return float(self.get_z_raw()) * self.factor
 
+    def fifo_entries(self):
+        return self.read(REG_FIFO_ENTRIES) & 0x7F
+
+    def set_fifo_watermark(self, samples=FIFO_WATERMARK):
+        """Raise INT1 once the FIFO holds `samples` x, y, z sets"""
+        entries = 3 * samples
+        if not 0 < entries <= FIFO_SIZE:
+            raise ValueError(f"FIFO watermark must be 1..{FIFO_SIZE // 3} samples")
+        self.set_config(REG_FIFO_SAMPLES, entries)
+        self.set_config(REG_INT_MAP, INT_FULL_EN1)
+        self.start()
+
+    def wait_fifo(self):
+        """Wait for the FIFO watermark, on INT1 or from FIFO_ENTRIES if INT1 is not wired"""
+        start = time.time()
+        if self.fifo_int_pin is None:
+            # Sleep for the samples still missing instead of polling STATUS every period
+            target = self.read_config(REG_FIFO_SAMPLES)
+            missing = target - self.fifo_entries()
+            while missing > 0:
+                if time.time() - start >= self.drdy_timeout:
+                    print("\nTimeout while waiting FIFO watermark")
+                    return
+                time.sleep(missing / 3 / self.odr)
+                missing = target - self.fifo_entries()
+            return
+        while self.backend.input(self.fifo_int_pin) == PIN_LOW:
+            if time.time() - start >= self.drdy_timeout:
+                print("\nTimeout while waiting FIFO watermark")
+                return
+            time.sleep(self.drdy_delay)
+
+    def read_fifo_bytes(self):
+        """Drain every FIFO entry in one SPI transfer, returns whole x, y, z sets as bytes"""
+        n = self.fifo_entries()
+        if n == 0:
+            return b''
+        address = (REG_FIFO_DATA << 1) | 0b1
+        data = bytes(self.transfer([address] + [0x00] * (3 * n))[1:])
+        data = self.fifo_partial + data
+        # Drop entries read while the FIFO was empty
+        if data[-1] & FIFO_EMPTY:
+            data = b''.join(data[i:i + 3] for i in range(0, len(data), 3)
+                            if not data[i + 2] & FIFO_EMPTY)
+        # Re-align on the first x-axis marker
+        start = 0
+        while start < len(data) and not data[start + 2] & FIFO_X_MARKER:
+            start += 3
+        end = start + (len(data) - start) // 9 * 9
+        self.fifo_partial = data[end:]
+        return data[start:end]
+
+    def read_fifo(self):
+        """Drain the FIFO and decode it to an (N, 3) int32 array of raw samples"""
+        return decode_raw(self.read_fifo_bytes())
+
     def get_3_v_fifo(self):
-        res = []
-        x = self.read(REG_FIFO_DATA, 3)
-        while(x[2] & 0b10 == 0):
-            y = self.read(REG_FIFO_DATA, 3)
-            z = self.read(REG_FIFO_DATA, 3)
-            res.append([x, y, z])
-            x = self.read(REG_FIFO_DATA, 3)
-        return res
+        return self.read_fifo()
+
+    def get_fifo_axis(self):
+        """Wait for a FIFO batch and return it as an (N, 3) float32 array in g"""
+        self.wait_fifo()
+        return self.decode(self.read_fifo_bytes())
+
+    def get_axis_block(self, n):
+        """Burst read n DRDY-paced samples and return them as an (n, 3) float32 array in g"""
+        buf = bytearray(AXIS_BURST_LENGTH * n)
+        for i in range(0, len(buf), AXIS_BURST_LENGTH):
+            self.wait_drdy()
+            buf[i:i + AXIS_BURST_LENGTH] = self.transfer(self.burst_cmd)[1:]
+        return self.decode(buf)
+
+    def decode(self, data, raw=False):
+        """Decode burst/FIFO bytes to (N, 3) int32 counts, or float32 g with offsets removed"""
+        if raw:
+            return decode_raw(data)
+        return decode_g(data, self.factor, self.offsets)
 
     def convert_raw_to_g(self, data):
-        """Convert a list of raw style samples into g values"""
-        res = [[d[0] * self.factor, d[1] * self.factor, d[2] * self.factor] for d in data]
-        return res
+        """Convert raw style samples into g values"""
+        return np.asarray(data, dtype=np.float32) * np.float32(self.factor)
 
     def get_axis_raw(self):
         self.wait_drdy()
-        return self.get_x_raw(), self.get_y_raw(), self.get_z_raw()
+        return self.get_xyz_raw()
     
     def get_axis(self):
         self.wait_drdy()
-        x = self.get_x() - self.offsets['x']
-        y = self.get_y() - self.offsets['y']
-        z = self.get_z() - self.offsets['z']
+        x, y, z = self.get_xyz_raw()
+        x = x * self.factor - self.offsets['x']
+        y = y * self.factor - self.offsets['y']
+        z = z * self.factor - self.offsets['z']
         return x, y, z
     
     def calibrate(self, samples=100):
@@ -197,14 +411,14 @@ class ADXL357():
     
     def reset_offsets(self):
         # Write 0 to all offset registers
-        self.write(REG_OFFSET_X_H, 0x00)
-        self.write(REG_OFFSET_X_L, 0x00)
+        self.write_config(REG_OFFSET_X_H, 0x00)
+        self.write_config(REG_OFFSET_X_L, 0x00)
         
-        self.write(REG_OFFSET_Y_H, 0x00)
-        self.write(REG_OFFSET_Y_L, 0x00)
+        self.write_config(REG_OFFSET_Y_H, 0x00)
+        self.write_config(REG_OFFSET_Y_L, 0x00)
         
-        self.write(REG_OFFSET_Z_H, 0x00)
-        self.write(REG_OFFSET_Z_L, 0x00)
+        self.write_config(REG_OFFSET_Z_H, 0x00)
+        self.write_config(REG_OFFSET_Z_L, 0x00)
 
         # Print confirmation
         print("All offsets reset to 0!")
@@ -0,0 +1,39 @@
+"""
+Hardware backends for the ADXL357 driver. A backend provides the SPI transfer
+function and access to the DRDY/INT GPIO lines, so the driver can run against
+the real Raspberry Pi hardware or the simulated sensor in ADXL357_simulator.
+"""
+
+from .ADXL357_definitions import *
+
+
+class SpidevBackend():
+    """spidev + RPi.GPIO backend for the Raspberry Pi"""
+
+    def __init__(self, bus=SPI_BUS, device=SPI_DEVICE):
+        import spidev
+        import RPi.GPIO as GPIO
+        self.GPIO = GPIO
+
+        # SPI init
+        self.spi = spidev.SpiDev()
+        self.spi.open(bus, device)
+        self.spi.max_speed_hz = SPI_MAX_CLOCK_HZ
+        self.spi.mode = SPI_MODE
+        self.transfer = self.spi.xfer2
+
+        GPIO.setmode(GPIO.BOARD)                # Use physical pin numbers
+
+    def setup_pin(self, pin):
+        self.GPIO.setup(pin, self.GPIO.IN)
+
+    def input(self, pin):
+        return self.GPIO.input(pin)
+
+    def wait_for_edge(self, pin, timeout):
+        """Block until a rising edge on pin, returns False on timeout"""
+        channel = self.GPIO.wait_for_edge(pin, self.GPIO.RISING, timeout=int(timeout * 1000))
+        return channel is not None
+
+    def close(self):
+        self.spi.close()
@@ -0,0 +1,106 @@
+"""
+Lossless block codec for raw ADXL357 counts (20-bit integers), for recordings and
+streamed blocks. Each axis is delta encoded along time and zigzag mapped to small
+unsigned integers, then either bit-packed to the widest value of the block or split
+into byte planes and compressed with zlib or lzma.
+
+    data = encode(counts, 'zlib')       # counts: (n, channels) integer array
+    counts = decode(data)               # (n, channels) int32, identical to the input
+
+The scale from counts to physical units is not part of the block, the caller keeps
+it next to the encoded data (see main/recording.py).
+"""
+
+import lzma
+import struct
+import zlib
+import numpy as np
+
+METHODS = ('none', 'zlib', 'lzma', 'packed')
+HEADER = struct.Struct('<BBI')          # Method, channels, samples
+
+
+def zigzag(values):
+    """Map signed int32 to uint32: 0, -1, 1, -2 ... -> 0, 1, 2, 3 ..."""
+    return ((values << 1) ^ (values >> 31)).view(np.uint32)
+
+
+def unzigzag(values):
+    return (values >> 1).astype(np.int32) ^ -(values & 1).astype(np.int32)
+
+
+def delta(counts):
+    """Per axis differences along time, the first sample is kept as is"""
+    return np.diff(counts, axis=0, prepend=np.zeros((1, counts.shape[1]), dtype=np.int32))
+
+
+def byte_planes(z):
+    """(n, channels) uint32 -> bytes ordered by channel, then byte, then sample"""
+    b = z.astype('<u4', copy=False).T.copy().view(np.uint8).reshape(z.shape[1], -1, 4)
+    return b.transpose(0, 2, 1).tobytes()
+
+
+def from_byte_planes(data, n, channels):
+    b = np.frombuffer(data, dtype=np.uint8).reshape(channels, 4, n).transpose(0, 2, 1)
+    return np.ascontiguousarray(b).view('<u4').reshape(channels, n).T
+
+
+def pack_bits(z):
+    """Bit-pack each channel to the width of its largest value: width bytes, then the bits"""
+    widths = [int(c.max()).bit_length() if len(c) else 0 for c in z.T]
+    parts = [bytes(widths)]
+    for c, w in zip(z.T, widths):
+        if w:
+            shifts = np.arange(w - 1, -1, -1, dtype=np.uint32)
+            parts.append(np.packbits(((c[:, None] >> shifts) & 1).astype(np.uint8)).tobytes())
+    return b''.join(parts)
+
+
+def unpack_bits(data, n, channels):
+    buf = np.frombuffer(data, dtype=np.uint8)
+    widths, pos = buf[:channels], channels
+    z = np.zeros((n, channels), dtype=np.uint32)
+    for i, w in enumerate(widths.tolist()):
+        if w:
+            size = (n * w + 7) // 8
+            bits = np.unpackbits(buf[pos:pos + size])[:n * w].reshape(n, w)
+            z[:, i] = bits.astype(np.uint32) @ (np.uint32(1) << np.arange(w - 1, -1, -1, dtype=np.uint32))
+            pos += size
+    return z
+
+
+def encode(counts, method='zlib', level=None):
+    """Encode an (n, channels) array of integer counts to bytes"""
+    counts = np.asarray(counts, dtype=np.int32)
+    if counts.ndim != 2:
+        raise ValueError(f"Expected an (n, channels) array, got shape {counts.shape}")
+    if method not in METHODS:
+        raise ValueError(f"Unknown codec method {method!r}, expected one of {METHODS}")
+    n, channels = counts.shape
+    if method == 'none':
+        body = counts.astype('<i4', copy=False).tobytes()
+    else:
+        z = zigzag(delta(counts))
+        if method == 'packed':
+            body = pack_bits(z)
+        elif method == 'zlib':
+            body = zlib.compress(byte_planes(z), 6 if level is None else level)
+        else:
+            body = lzma.compress(byte_planes(z), preset=0 if level is None else level)
+    return HEADER.pack(METHODS.index(method), channels, n) + body
+
+
+def decode(data):
+    """Decode bytes from encode() back to the (n, channels) int32 counts"""
+    method, channels, n = HEADER.unpack_from(data)
+    body = memoryview(data)[HEADER.size:]
+    method = METHODS[method]
+    if method == 'none':
+        return np.frombuffer(body, dtype='<i4').reshape(n, channels).astype(np.int32)
+    if method == 'packed':
+        z = unpack_bits(body, n, channels)
+    elif method == 'zlib':
+        z = from_byte_planes(zlib.decompress(body), n, channels)
+    else:
+        z = from_byte_planes(lzma.decompress(body), n, channels)
+    return np.cumsum(unzigzag(z), axis=0, dtype=np.int32)
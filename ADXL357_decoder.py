@@ -0,0 +1,27 @@
+"""
+Vectorized decoding of raw ADXL357 sample buffers. Works on the bytes of a
+XDATA3..ZDATA1 burst read or a FIFO drain: 3 bytes per axis, 9 bytes per
+x, y, z set, 20-bit two's complement left aligned in the 3 bytes.
+"""
+
+import numpy as np
+
+
+def decode_raw(data):
+    """Decode a bytes/bytearray of x, y, z sets to an (N, 3) int32 array of raw counts"""
+    b = np.frombuffer(data, dtype=np.uint8)     # Zero-copy view of the buffer
+    b = b[:len(b) // 9 * 9].reshape(-1, 3, 3)
+    raw = ((b[..., 0].astype(np.int32) << 12)
+           | (b[..., 1].astype(np.int32) << 4)
+           | (b[..., 2] >> 4))
+    # Sign extend 20 -> 32 bits
+    return (raw << 12) >> 12
+
+
+def decode_g(data, factor, offsets=None):
+    """Decode a bytes/bytearray of x, y, z sets to an (N, 3) float32 array in g"""
+    res = decode_raw(data).astype(np.float32)
+    res *= np.float32(factor)
+    if offsets is not None:
+        res -= np.array([offsets['x'], offsets['y'], offsets['z']], dtype=np.float32)
+    return res
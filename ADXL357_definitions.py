@@ -9,6 +9,19 @@ SPI_DEVICE = 0
 DRDY_PIN = 11              # Raspberry Pi GPIO pin for DRDY cable 
 DRDY_DELAY = 0.000001      # Delay while polling DRDY pin in seconds 
 DRDY_TIMEOUT = 2           # Timeout for DRDY pin in seconds
+PIN_LOW = 0                # GPIO input levels
+PIN_HIGH = 1
+DRDY_MODE = 'edge'         # 'edge' blocks on the DRDY rising edge, 'poll' polls the pin level
+
+
+# Start-up timing
+RESET_DELAY = 0.01         # Wait after a soft reset before writing registers, in seconds
+TURN_ON_DELAY = 0.01       # Standby to measurement turn-on time, in seconds
+
+
+# FIFO config
+FIFO_INT_PIN = None        # Raspberry Pi GPIO pin for INT1 (FIFO watermark), None if not wired
+FIFO_WATERMARK = 32        # Samples (x, y, z sets) per FIFO batch
 
 
 # Register addresses
@@ -49,6 +62,44 @@ REG_POWER_CTL    = 0x2D
 REG_SELF_TEST    = 0x2E
 REG_RESET        = 0x2F
 
+RESET_CODE       = 0x52    # Written to REG_RESET for a soft reset
+
+# Register values after power-on or soft reset
+RESET_VALUES = {REG_DEVID_AD: 0xAD,
+                REG_DEVID_MST: 0x1D,
+                REG_PARTID: 0xED,
+                REG_REVID: 0x01,
+                REG_FIFO_SAMPLES: 0x60,
+                REG_RANGE: 0x81,
+                REG_POWER_CTL: 0x01}
+
+# Writable configuration registers mirrored by the driver's shadow cache
+CONFIG_REGISTERS = (REG_OFFSET_X_H, REG_OFFSET_X_L,
+                    REG_OFFSET_Y_H, REG_OFFSET_Y_L,
+                    REG_OFFSET_Z_H, REG_OFFSET_Z_L,
+                    REG_ACT_EN, REG_ACT_THRESH_H, REG_ACT_THRESH_L, REG_ACT_COUNT,
+                    REG_FILTER, REG_FIFO_SAMPLES, REG_INT_MAP, REG_SYNC,
+                    REG_RANGE, REG_POWER_CTL, REG_SELF_TEST)
+
+AXIS_BURST_LENGTH = 9      # XDATA3..ZDATA1 read in one transfer
+
+
+# FIFO definition
+FIFO_SIZE        = 96      # FIFO depth in entries (one entry per axis)
+FIFO_X_MARKER    = 0b01    # Bit 0 of the last byte: entry is an x-axis value
+FIFO_EMPTY       = 0b10    # Bit 1 of the last byte: FIFO was empty on read
+
+
+# Interrupt map definition
+INT_RDY_EN1      = 0b00000001
+INT_FULL_EN1     = 0b00000010
+INT_OVR_EN1      = 0b00000100
+INT_ACT_EN1      = 0b00001000
+INT_RDY_EN2      = 0b00010000
+INT_FULL_EN2     = 0b00100000
+INT_OVR_EN2      = 0b01000000
+INT_ACT_EN2      = 0b10000000
+
 
 # Measaurement range definition
 RANGE_10G     = 0b01
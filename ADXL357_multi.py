@@ -0,0 +1,202 @@
+"""
+Acquisition from several ADXL357 on one host. Each sensor is drained through its
+FIFO, either from a single loop or from one thread per SPI bus, and the streams
+are emitted as time-aligned blocks: sample i of every sensor in a block belongs
+to the same sample period.
+
+Sensors stay aligned by sample count. After every drain each sensor's count is
+compared with the time since start times the ODR, and the median of the last
+`skew_window` comparisons is the sensor's offset (samples still in the FIFO or
+produced during the read make single ones low). Samples lost to a FIFO overrun
+are filled with NaN, and the history of that sensor starts over, so its offset
+follows the new count after `min_drains` drains. The sensor furthest ahead is the
+reference: one that falls more than `max_skew` samples behind it (a slower
+oscillator, or an overrun lost more than estimated) is padded with NaN, where the
+overrun was if there was one. Blocks wait until every history is `min_drains` long.
+
+    sensors = [ADXL357(bus=0, device=0, drdy_pin=11), ADXL357(bus=0, device=1, drdy_pin=13)]
+    acq = MultiSensorAcquisition(sensors, block_size=64)
+    acq.start()
+    index, block = acq.read_block()     # block: (n_sensors, 64, 3) float32 in g
+"""
+
+import threading
+import time
+import numpy as np
+from .ADXL357_definitions import *
+from .ADXL357_decoder import decode_g
+
+
+class MultiSensorAcquisition():
+    def __init__(self, sensors, block_size=64, threads_per_bus=False, max_skew=2, skew_window=32, min_drains=4):
+        odrs = {s.odr for s in sensors}
+        if len(odrs) != 1:
+            raise ValueError("All sensors must be configured with the same ODR")
+        self.sensors = list(sensors)
+        self.odr = odrs.pop()
+        self.block_size = block_size
+        self.threads_per_bus = threads_per_bus
+        # Drain at a quarter of the FIFO depth (FIFO_SIZE // 3 samples) to absorb scheduling delays
+        self.poll_interval = min(block_size, FIFO_SIZE // 12) / self.odr
+
+        self.max_skew = max_skew
+        self.skew_window = skew_window
+        self.min_drains = min_drains
+        self.pending = [bytearray() for _ in self.sensors]  # Drained, not yet emitted x, y, z sets
+        self.gaps = [[] for _ in self.sensors]              # (sample index, samples) of NaN padding per sensor
+        self.overruns = [0] * len(self.sensors)             # FIFO overrun events per sensor
+        self.lost = [0] * len(self.sensors)                 # Samples lost to overruns, filled with NaN
+        self.padded = [0] * len(self.sensors)               # NaN samples added to follow the others
+        self.received = [0] * len(self.sensors)             # Samples per sensor since start, padding included
+        self.offsets = [[] for _ in self.sensors]           # Count - elapsed time * ODR of the last drains
+        self.skew = [0.0] * len(self.sensors)               # Samples behind (-) the sensor furthest ahead
+        self.resync = [None] * len(self.sensors)            # Sample index after an overrun gap, until realigned
+        self.index = 0                                      # Sample index of the next block
+        self.t0 = None                                      # monotonic() of sample 0
+        self.cond = threading.Condition()
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def start(self):
+        """Start every sensor back to back so their sample periods line up"""
+        for sensor in self.sensors:
+            sensor.stop()
+        for sensor in self.sensors:
+            sensor.read_fifo_bytes()                        # Discard samples from before the start
+            sensor.fifo_partial = b''
+        for p in self.pending:
+            p.clear()
+        n = len(self.sensors)
+        self.gaps = [[] for _ in range(n)]
+        self.overruns, self.lost, self.padded = [0] * n, [0] * n, [0] * n
+        self.received = [0] * n
+        self.offsets = [[] for _ in range(n)]
+        self.skew = [0.0] * n
+        self.resync = [None] * n
+        self.index = 0
+        self.stop_event.clear()
+        for sensor in self.sensors:
+            sensor.start()
+        self.t0 = time.monotonic() + TURN_ON_DELAY
+        self.drained_at = [self.t0] * n                     # monotonic() of the last drain
+
+        if self.threads_per_bus:
+            buses = {}
+            for i, sensor in enumerate(self.sensors):
+                buses.setdefault(sensor.bus, []).append(i)
+            self.threads = [threading.Thread(target=self.bus_task, args=(indices,), daemon=True)
+                            for indices in buses.values()]
+            for thread in self.threads:
+                thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        for sensor in self.sensors:
+            sensor.stop()
+
+    def poll(self, indices):
+        """Drain the FIFO of the given sensors into their pending buffers"""
+        for i in indices:
+            sensor = self.sensors[i]
+            before = time.monotonic()
+            data = sensor.read_fifo_bytes()
+            now = time.monotonic()
+            # SPI reads stay outside the lock
+            overrun = sensor.fifooverrange()
+            waiting = sensor.fifo_entries() // 3 if overrun else 0
+            with self.cond:
+                self.pending[i] += data
+                self.received[i] += len(data) // 9
+                if overrun:
+                    # The FIFO was emptied at the last drain and kept its oldest samples:
+                    # the ones produced after it filled up are lost. The shortest time
+                    # the drains can be apart, less what was read and what came in since,
+                    # gives a low estimate; realign() adds the rest from a fresh history
+                    self.overruns[i] += 1
+                    produced = int((before - self.drained_at[i]) * self.odr)
+                    lost = max(produced - len(data) // 9 - waiting, 0)
+                    self.pad(i, lost)
+                    self.lost[i] += lost
+                    self.offsets[i] = []
+                    self.resync[i] = self.received[i]
+                self.drained_at[i] = now
+                if before > self.t0:
+                    # Sensors produce nothing before the turn-on time is over
+                    offset = self.received[i] - (now - self.t0) * self.odr
+                    self.offsets[i] = self.offsets[i][1 - self.skew_window:] + [offset]
+                    self.realign()
+                self.cond.notify_all()
+
+    def pad(self, i, n, at=None):
+        """Insert n NaN samples into sensor i before sample `at` (default: at the end)"""
+        if n > 0:
+            at = self.received[i] if at is None else max(at, self.index)
+            k = (at - self.index) * 9
+            self.pending[i][k:k] = bytes(9 * n)
+            self.gaps[i] = [(s + n if s >= at else s, m) for s, m in self.gaps[i]] + [(at, n)]
+            self.received[i] += n
+
+    def realign(self):
+        """Pad every sensor that fell more than max_skew samples behind the one furthest ahead"""
+        # Sensors with a fresh history (start, overrun) wait until their offset settles
+        offsets = {i: np.median(o) for i, o in enumerate(self.offsets) if len(o) >= self.min_drains}
+        if not offsets:
+            return
+        reference = max(offsets.values())
+        for i, offset in offsets.items():
+            self.skew[i] = offset - reference
+            if self.skew[i] < -self.max_skew:
+                n = round(-self.skew[i])
+                self.pad(i, n, self.resync[i])
+                self.padded[i] += n
+                # Earlier drains were just as far behind
+                self.offsets[i] = [o + n for o in self.offsets[i]]
+                self.skew[i] += n
+            self.resync[i] = None
+
+    def bus_task(self, indices):
+        while not self.stop_event.is_set():
+            self.poll(indices)
+            time.sleep(self.poll_interval)
+
+    def ready(self):
+        need = self.block_size * 9
+        return (all(len(p) >= need for p in self.pending)
+                and all(len(o) >= self.min_drains for o in self.offsets))
+
+    def read_block(self):
+        """Wait for the next block, returns (sample index, (n_sensors, block_size, 3) array in g)
+        or None once stopped"""
+        while not self.stop_event.is_set():
+            with self.cond:
+                if self.ready():
+                    return self.take_block()
+                if self.threads:
+                    self.cond.wait(self.poll_interval)
+                    continue
+            self.poll(range(len(self.sensors)))
+            if not self.ready():
+                time.sleep(self.poll_interval)
+        return None
+
+    def take_block(self):
+        need = self.block_size * 9
+        block = np.empty((len(self.sensors), self.block_size, 3), dtype=np.float32)
+        index = self.index
+        end = index + self.block_size
+        for i, (sensor, p) in enumerate(zip(self.sensors, self.pending)):
+            block[i] = decode_g(bytes(p[:need]), sensor.factor, sensor.offsets)
+            del p[:need]
+            for start, n in self.gaps[i]:
+                if start < end and start + n > index:
+                    block[i, max(start, index) - index:min(start + n, end) - index] = np.nan
+            self.gaps[i] = [(s, n) for s, n in self.gaps[i] if s + n > end]
+        self.index = end
+        return index, block
+
+    def time_of(self, index):
+        """monotonic() time of a sample index"""
+        return self.t0 + index / self.odr
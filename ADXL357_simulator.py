@@ -0,0 +1,202 @@
+"""
+Simulated ADXL357 for running and benchmarking the driver off the Raspberry Pi.
+Emulates the SPI register map of ADXL357_definitions (RANGE, FILTER, POWER_CTL,
+FIFO, STATUS, data registers) and generates samples at the programmed ODR in
+real time, so DRDY timing, FIFO fill and overflow behave like the real part.
+
+    sensor = ADXL357(backend=ADXL357Simulator(waveforms={'x': sine(50, 0.5)}))
+"""
+
+import math
+import time
+import threading
+import numpy as np
+from .ADXL357_definitions import *
+
+BIT_TO_RANGE = {v: k for k, v in RANGE_TO_BIT.items()}
+BIT_TO_ODR = {v: k for k, v in ODR_TO_BIT.items()}
+
+
+def sine(freq, amp, phase=0.0):
+    """Waveform in g: amp * sin(2 pi freq t + phase)"""
+    return lambda t: amp * np.sin(2 * np.pi * freq * t + phase)
+
+
+def constant(value):
+    return lambda t: np.full(len(t), value, dtype=np.float64)
+
+
+class ADXL357Simulator():
+    """Backend emulating the ADXL357 register map and DRDY/INT1 lines"""
+
+    def __init__(self, waveforms=None, noise=0.0, drdy_pin=DRDY_PIN, int1_pin=FIFO_INT_PIN, seed=None,
+                 clock_ppm=0.0):
+        # Waveforms per axis, callables of a time array in seconds returning g
+        self.waveforms = {'x': sine(50, 0.5), 'y': sine(120, 0.2), 'z': constant(1.0)}
+        self.waveforms.update(waveforms or {})
+        self.noise = noise                      # Gaussian noise in g rms
+        self.clock_ppm = clock_ppm              # Oscillator error: samples come at odr * (1 + ppm / 1e6)
+        self.rng = np.random.default_rng(seed)
+        self.drdy_pin = drdy_pin
+        self.int1_pin = int1_pin
+        self.lock = threading.Lock()
+        self.transfers = 0                      # SPI transfers served
+        self.bytes = 0                          # SPI bytes clocked
+        self.reset()
+
+    def reset(self):
+        self.regs = bytearray(0x40)
+        for reg, value in RESET_VALUES.items():
+            self.regs[reg] = value
+        self.fifo = bytearray()
+        self.t0 = None                          # Start of measurement mode, after the turn-on time
+        self.produced = 0                       # Samples generated since t0
+
+    # --- Backend interface ---
+    def setup_pin(self, pin):
+        pass
+
+    def input(self, pin):
+        with self.lock:
+            self.update()
+            if pin == self.drdy_pin:
+                return PIN_HIGH if self.regs[REG_STATUS] & 0b1 else PIN_LOW
+            if pin == self.int1_pin:
+                return PIN_HIGH if self.regs[REG_STATUS] & self.regs[REG_INT_MAP] & 0b111 else PIN_LOW
+        return PIN_LOW
+
+    def wait_for_edge(self, pin, timeout):
+        """Sleep until the next sample is produced, returns False on timeout"""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self.lock:
+                if self.t0 is None:
+                    next_t = math.inf           # Standby, no sample will come
+                else:
+                    next_t = self.t0 + (self.produced + 1) / (self.odr() * (1 + self.clock_ppm * 1e-6))
+            now = time.monotonic()
+            if next_t > deadline:
+                time.sleep(max(deadline - now, 0))
+                return False
+            if next_t > now:
+                time.sleep(next_t - now)
+            if self.input(pin) == PIN_HIGH:
+                return True
+
+    def transfer(self, data):
+        with self.lock:
+            self.transfers += 1
+            self.bytes += len(data)
+            self.update()
+            register = data[0] >> 1
+            if not data[0] & 0b1:
+                self.write(register, data[1:])
+                return [0] * len(data)
+            return [0] + self.read(register, len(data) - 1)
+
+    def close(self):
+        pass
+
+    # --- Register map ---
+    def odr(self):
+        return BIT_TO_ODR[self.regs[REG_FILTER] & 0x0F]
+
+    def sensitivity(self):
+        return RANGE_TO_SENSITIVITY[BIT_TO_RANGE[self.regs[REG_RANGE] & 0b11]]
+
+    def write(self, register, values):
+        for value in values:
+            if register == REG_RESET:
+                if value == RESET_CODE:
+                    self.reset()
+            elif register == REG_POWER_CTL:
+                standby = value & 0b1
+                if standby:
+                    self.t0 = None
+                    self.regs[REG_STATUS] &= ~0b1 & 0xFF
+                elif self.t0 is None:
+                    self.t0 = time.monotonic() + TURN_ON_DELAY
+                    self.produced = 0
+                self.regs[register] = value
+            elif register >= REG_OFFSET_X_H:
+                self.regs[register] = value
+            register += 1
+
+    def read(self, register, length):
+        if register == REG_FIFO_DATA:
+            return self.pop_fifo(length)
+        res = []
+        for i in range(length):
+            reg = register + i
+            if reg == REG_FIFO_ENTRIES:
+                res.append(len(self.fifo) // 3)
+            elif reg < len(self.regs):
+                res.append(self.regs[reg])
+            else:
+                res.append(0)
+            if reg == REG_ZDATA1:
+                self.regs[REG_STATUS] &= ~0b1 & 0xFF   # Data read, clear DATA_RDY
+        if register == REG_STATUS:
+            self.regs[REG_STATUS] &= ~0b100 & 0xFF     # FIFO_OVR clears on read
+        return res
+
+    def pop_fifo(self, length):
+        n = min(length, len(self.fifo)) // 3 * 3
+        res = list(self.fifo[:n])
+        del self.fifo[:n]
+        res += [0x00, 0x00, FIFO_EMPTY] * ((length - n) // 3 + 1)
+        self.update_status()
+        return res[:length]
+
+    def update_status(self):
+        status = self.regs[REG_STATUS] & 0b101
+        if len(self.fifo) // 3 >= self.regs[REG_FIFO_SAMPLES]:
+            status |= 0b10
+        self.regs[REG_STATUS] = status
+
+    # --- Sample generation ---
+    def update(self):
+        """Generate every sample due since the last update"""
+        if self.t0 is None:
+            return
+        rate = self.odr() * (1 + self.clock_ppm * 1e-6)
+        due = math.floor((time.monotonic() - self.t0) * rate)
+        n = due - self.produced
+        if n <= 0:
+            return
+        # Only the newest FIFO_SIZE // 3 samples can still be observed
+        keep = min(n, FIFO_SIZE // 3)
+        t = (np.arange(due - keep, due) + 1) / rate
+        g = np.stack([self.waveforms[a](t) for a in ('x', 'y', 'z')], axis=-1)
+        if self.noise:
+            g = g + self.rng.normal(0.0, self.noise, g.shape)
+        counts = np.clip(np.round(g * self.sensitivity()), -2**19, 2**19 - 1).astype(np.int32)
+        counts -= self.offset_counts()
+        u = counts.astype(np.uint32) & 0xFFFFF
+        b = np.stack([(u >> 12) & 0xFF, (u >> 4) & 0xFF, (u & 0xF) << 4], axis=-1).astype(np.uint8)
+        b[:, 0, 2] |= FIFO_X_MARKER
+        self.produced = due
+
+        # Data registers hold the newest sample
+        last = b[-1].copy()
+        last[0, 2] &= 0xF0
+        self.regs[REG_XDATA3:REG_ZDATA1 + 1] = last.tobytes()
+        status = self.regs[REG_STATUS] | 0b1
+
+        space = FIFO_SIZE * 3 - len(self.fifo)
+        data = b.tobytes()
+        if n > keep or len(data) > space:
+            status |= 0b100                     # FIFO overrun, newest samples are lost
+        self.fifo += data[:space // 9 * 9]
+        self.regs[REG_STATUS] = status
+        self.update_status()
+
+    def offset_counts(self):
+        """Offset registers hold bits [19:4] of the offset, subtracted from the output"""
+        res = []
+        for reg in (REG_OFFSET_X_H, REG_OFFSET_Y_H, REG_OFFSET_Z_H):
+            v = (self.regs[reg] << 8) | self.regs[reg + 1]
+            if v & 0x8000:
+                v -= 0x10000
+            res.append(v << 4)
+        return np.array(res, dtype=np.int32)
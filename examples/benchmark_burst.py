@@ -0,0 +1,42 @@
+import time
+import sys
+sys.path.append("../")
+from ADXL357 import ADXL357, ADXL357_simulator
+
+# --- INPUTS ---
+output_range = 40               # Select measurement range
+sampling_rate = 4000            # Select sampling rate
+hpass_corner = 0                # Select high-pass filter corner
+n_calls = 20000                 # Reads per benchmark
+simulate = '--sim' in sys.argv  # Run against the simulated sensor instead of the SPI bus
+
+
+# --- SET ADXL357 PARAMETERS ---
+backend = ADXL357_simulator.ADXL357Simulator() if simulate else None
+adxl357 = ADXL357.ADXL357(backend=backend)
+adxl357.setrange(output_range)
+adxl357.setfilter(sampling_rate, hpass_corner)
+adxl357.start()
+time.sleep(0.1)
+
+
+def per_axis_read():
+    return adxl357.get_x_raw(), adxl357.get_y_raw(), adxl357.get_z_raw()
+
+
+def bench(name, fn):
+    start = time.perf_counter()
+    for _ in range(n_calls):
+        fn()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<22} {n_calls / elapsed:10.0f} calls/s  ({1e6 * elapsed / n_calls:.1f} us/call)")
+    return n_calls / elapsed
+
+
+# --- BENCHMARK (no DRDY wait, pure SPI + decode cost) ---
+print(f"Reading {n_calls} samples per mode...\n")
+before = bench("3 x read(reg, 3)", per_axis_read)
+after = bench("get_xyz_raw (burst)", adxl357.get_xyz_raw)
+print(f"\nSpeed-up: {after / before:.2f}x")
+
+adxl357.stop()
@@ -0,0 +1,33 @@
+import sys
+sys.path.append("../")
+from ADXL357 import ADXL357, ADXL357_simulator
+
+# --- INPUTS ---
+sampling_rate = 4000            # Select sampling rate
+hpass_corner = 0                # Select high-pass filter corner
+
+
+# --- RECONFIGURATION SEQUENCE (VibrationMonitor init + mode toggles + a range change) ---
+def sequence(adxl357):
+    adxl357.setrange(40)
+    adxl357.setfilter(sampling_rate, hpass_corner)
+    adxl357.start()
+    adxl357.stop()
+    adxl357.start()
+    adxl357.setrange(10)
+    adxl357.setfilter(sampling_rate, hpass_corner)
+    adxl357.set_fifo_watermark(16)
+
+
+# --- BENCHMARK (SPI traffic counted by the simulated sensor) ---
+print(f"{'shadow cache':<13} {'transfers':>10} {'bytes':>7}")
+for shadow in (False, True):
+    sim = ADXL357_simulator.ADXL357Simulator()
+    adxl357 = ADXL357.ADXL357(backend=sim)
+    adxl357.shadow_enabled = shadow
+    transfers, nbytes = sim.transfers, sim.bytes
+    sequence(adxl357)
+    print(f"{'on' if shadow else 'off':<13} {sim.transfers - transfers:10d} {sim.bytes - nbytes:7d}")
+    assert not adxl357.verify()
+
+adxl357.stop()
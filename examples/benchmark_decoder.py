@@ -0,0 +1,56 @@
+import time
+import sys
+import numpy as np
+sys.path.append("../")
+from ADXL357.ADXL357_decoder import decode_raw, decode_g
+from ADXL357.ADXL357_definitions import RANGE_TO_SENSITIVITY
+
+# --- INPUTS ---
+n_samples = 1000000             # x, y, z sets to decode
+factor = 1 / RANGE_TO_SENSITIVITY[40]
+
+
+# --- SCALAR REFERENCE (same shift/OR + conversion as ADXL357.get_?_raw) ---
+def conversion(value):
+    if (0x80000 & value):
+        return - (0x0100000 - value)
+    return value
+
+
+def scalar_decode(data):
+    res = []
+    for i in range(0, len(data), 9):
+        x = conversion((data[i] << 12) | (data[i + 1] << 4) | (data[i + 2] >> 4))
+        y = conversion((data[i + 3] << 12) | (data[i + 4] << 4) | (data[i + 5] >> 4))
+        z = conversion((data[i + 6] << 12) | (data[i + 7] << 4) | (data[i + 8] >> 4))
+        res.append([x * factor, y * factor, z * factor])
+    return res
+
+
+# --- TEST DATA ---
+rng = np.random.default_rng(0)
+counts = rng.integers(-2**19, 2**19, size=(n_samples, 3), dtype=np.int32)
+u = counts.astype(np.uint32) & 0xFFFFF
+data = np.stack([(u >> 12) & 0xFF, (u >> 4) & 0xFF, (u & 0xF) << 4], axis=-1).astype(np.uint8).tobytes()
+
+# --- BENCHMARK ---
+start = time.perf_counter()
+ref = scalar_decode(data)
+t_scalar = time.perf_counter() - start
+
+start = time.perf_counter()
+raw = decode_raw(data)
+t_raw = time.perf_counter() - start
+
+start = time.perf_counter()
+res = decode_g(data, factor)
+t_g = time.perf_counter() - start
+
+assert np.array_equal(raw, counts)
+assert np.allclose(res, np.array(ref), atol=1e-6)
+
+print(f"Samples          : {n_samples}")
+print(f"Scalar (lists)   : {t_scalar:8.3f} s  ({n_samples / t_scalar / 1e6:7.2f} Msamples/s)")
+print(f"decode_raw int32 : {t_raw:8.3f} s  ({n_samples / t_raw / 1e6:7.2f} Msamples/s)")
+print(f"decode_g float32 : {t_g:8.3f} s  ({n_samples / t_g / 1e6:7.2f} Msamples/s)")
+print(f"Speed-up         : {t_scalar / t_g:.0f}x")
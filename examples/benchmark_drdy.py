@@ -0,0 +1,38 @@
+import time
+import sys
+sys.path.append("../")
+from ADXL357 import ADXL357, ADXL357_simulator
+
+# --- INPUTS ---
+output_range = 40               # Select measurement range
+sampling_rate = 4000            # Select sampling rate
+hpass_corner = 0                # Select high-pass filter corner
+n_samples = 20000               # Samples per mode
+simulate = '--sim' in sys.argv  # Run against the simulated sensor instead of the SPI bus
+
+
+# --- SET ADXL357 PARAMETERS ---
+backend = ADXL357_simulator.ADXL357Simulator() if simulate else None
+adxl357 = ADXL357.ADXL357(backend=backend)
+adxl357.setrange(output_range)
+adxl357.setfilter(sampling_rate, hpass_corner)
+
+
+# --- BENCHMARK ---
+print(f"{'mode':<6} {'CPU ms/1k':>10} {'wall ms/1k':>11} {'CPU %':>6} {'missed':>7} {'timeouts':>9}")
+for mode in ('poll', 'edge'):
+    adxl357.drdy_mode = mode
+    adxl357.drdy_missed = 0
+    adxl357.drdy_timeouts = 0
+    adxl357.start()
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    for _ in range(n_samples):
+        adxl357.get_axis()
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+    k = n_samples / 1000
+    print(f"{adxl357.drdy_mode:<6} {1000 * cpu / k:10.2f} {1000 * wall / k:11.2f} "
+          f"{100 * cpu / wall:6.1f} {adxl357.drdy_missed:7d} {adxl357.drdy_timeouts:9d}")
+
+adxl357.stop()
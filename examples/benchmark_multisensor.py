@@ -0,0 +1,53 @@
+import time
+import sys
+import numpy as np
+sys.path.append("../")
+from ADXL357 import ADXL357, ADXL357_simulator, ADXL357_multi
+
+# --- INPUTS ---
+output_range = 40               # Select measurement range
+sampling_rate = 4000            # Select sampling rate
+block_size = 64                 # Samples per aligned block
+duration = 5                    # Seconds per configuration
+max_sensors = 4                 # Simulated sensors, alternating between SPI bus 0 and 1
+drift_ppm = 2000                # Oscillator error of the last sensor in the drift runs
+
+
+def make_sensors(n, ppm=0.0):
+    """n simulated sensors with the same signal, the last one off by ppm"""
+    return [ADXL357.ADXL357(backend=ADXL357_simulator.ADXL357Simulator(clock_ppm=ppm if i == n - 1 else 0.0),
+                            output_range=output_range, sampling_rate=sampling_rate, bus=i % 2, device=i // 2)
+            for i in range(n)]
+
+
+# --- BENCHMARK ---
+# Every sensor sees the same signal, so aligned blocks match across sensors: 'mismatch' is the
+# median and largest difference to sensor 0 in g over the last second, NaN padding excluded
+print(f"{'sensors':>7} {'mode':<10} {'ppm':>5} {'samples/s/sensor':>17} {'CPU %':>6} {'overruns':>9} "
+      f"{'lost':>5} {'padded':>7} {'max skew':>9} {'mismatch':>9} {'max':>7}")
+for n in range(1, max_sensors + 1):
+    for threads_per_bus in (False, True):
+        for ppm in ((0.0, drift_ppm) if n > 1 else (0.0,)):
+            acq = ADXL357_multi.MultiSensorAcquisition(make_sensors(n, ppm), block_size, threads_per_bus)
+            acq.start()
+            samples = 0
+            skew = 0.0
+            tail = []
+            cpu = time.process_time()
+            start = time.perf_counter()
+            while time.perf_counter() - start < duration:
+                index, block = acq.read_block()
+                samples += block.shape[1]
+                skew = max(skew, max(abs(s) for s in acq.skew))
+                if time.perf_counter() - start > duration - 1:
+                    tail.append(block)
+            elapsed = time.perf_counter() - start
+            cpu = time.process_time() - cpu
+            acq.stop()
+            tail = np.concatenate(tail, axis=1)
+            diff = np.abs(tail - tail[:1])[1:]
+            mismatch = (np.nanmedian(diff), np.nanmax(diff)) if n > 1 else (0.0, 0.0)
+            mode = 'per bus' if threads_per_bus else 'one loop'
+            print(f"{n:7d} {mode:<10} {ppm:5.0f} {samples / elapsed:17.0f} {100 * cpu / elapsed:6.1f} "
+                  f"{sum(acq.overruns):9d} {sum(acq.lost):5d} {sum(acq.padded):7d} {skew:9.1f} "
+                  f"{mismatch[0]:9.4f} {mismatch[1]:7.3f}")
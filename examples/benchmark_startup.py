@@ -0,0 +1,51 @@
+import time
+import sys
+sys.path.append("../")
+from ADXL357 import ADXL357, ADXL357_simulator
+
+# --- INPUTS ---
+output_range = 40               # Select measurement range
+sampling_rate = 4000            # Select sampling rate
+hpass_corner = 0                # Select high-pass filter corner
+simulate = '--sim' in sys.argv  # Run against the simulated sensor instead of the SPI bus
+
+
+def new_backend():
+    return ADXL357_simulator.ADXL357Simulator() if simulate else None
+
+
+def spi_transfers(adxl357):
+    return getattr(adxl357.backend, 'transfers', 0)   # Only counted by the simulated sensor
+
+
+# --- PREVIOUS START-UP (ADXL357 init + VibrationMonitor reconfiguration, no shadow cache) ---
+adxl357 = ADXL357.ADXL357(backend=new_backend())
+adxl357.stop()
+adxl357.shadow_enabled = False
+transfers = spi_transfers(adxl357)
+start = time.perf_counter()
+adxl357.setrange(output_range)
+adxl357.setfilter(sampling_rate, hpass_corner)
+adxl357.wait_drdy()
+adxl357.reset_offsets()
+adxl357.setrange(output_range)
+adxl357.setfilter(sampling_rate, hpass_corner)
+adxl357.get_axis()
+legacy = time.perf_counter() - start
+legacy_transfers = spi_transfers(adxl357) - transfers
+adxl357.stop()
+
+
+# --- FAST START-UP (soft reset + one configuration transfer) ---
+start = time.perf_counter()
+adxl357 = ADXL357.ADXL357(backend=new_backend(), output_range=output_range,
+                          sampling_rate=sampling_rate, hpass_corner=hpass_corner)
+adxl357.get_axis()
+fast = time.perf_counter() - start
+fast_transfers = spi_transfers(adxl357)
+adxl357.stop()
+
+
+print(f"\n{'start-up':<10} {'to first sample':>16} {'SPI transfers':>14}")
+print(f"{'previous':<10} {1000 * legacy:13.1f} ms {legacy_transfers:>14}")
+print(f"{'fast':<10} {1000 * fast:13.1f} ms {fast_transfers:>14}")
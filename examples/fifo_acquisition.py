@@ -0,0 +1,39 @@
+import time
+import sys
+sys.path.append("../")
+from ADXL357 import ADXL357, ADXL357_simulator
+
+# --- INPUTS ---
+output_range = 40               # Select measurement range
+sampling_rate = 4000            # Select sampling rate
+hpass_corner = 0                # Select high-pass filter corner
+watermark = 16                  # Samples per FIFO batch
+duration = 10                   # Record lenght as second
+simulate = '--sim' in sys.argv  # Run against the simulated sensor instead of the SPI bus
+
+
+# --- SET ADXL357 PARAMETERS ---
+backend = ADXL357_simulator.ADXL357Simulator() if simulate else None
+adxl357 = ADXL357.ADXL357(backend=backend)
+adxl357.setrange(output_range)
+adxl357.setfilter(sampling_rate, hpass_corner)
+adxl357.set_fifo_watermark(watermark)
+time.sleep(0.1)
+
+
+# --- READING LOOP ---
+print("Recording...")
+samples = 0
+wakeups = 0
+start = time.time()
+while time.time() - start < duration:
+    batch = adxl357.get_fifo_axis()
+    samples += len(batch)
+    wakeups += 1
+end = time.time()
+adxl357.stop()
+
+elapsed = end - start
+print(f"Elapsed Time : {elapsed:.2f} second")
+print(f"Samples      : {samples} ({samples / elapsed:.0f} Hz, expected {sampling_rate} Hz)")
+print(f"Wake-ups     : {wakeups} ({wakeups / elapsed:.0f} per second)")
@@ -0,0 +1,79 @@
+"""
+Hand-off cost between the sampling task and its consumers, per sample vs per block.
+
+    python benchmark_blocks.py [n_samples]
+
+per-sample: one (t, x, y, z) tuple per sample, axis swap and g scaling in Python, queue.Queue
+per-block:  FIFO batches scaled with NumPy into a reused block, RingBuffer.put_block with a
+            start time and rate per block, and views
+"""
+
+import queue
+import sys
+import time
+import numpy as np
+
+from ring_buffer import RingBuffer
+from sample_clock import SampleClock
+
+G = 9.80665
+
+
+def per_sample(samples, clock):
+    q = queue.Queue()
+    for s in samples:
+        q.put((clock.time_of(clock.advance(1)), s[1] * G, s[0] * G, s[2] * G))
+    window = []
+    while not q.empty():
+        window.append(q.get())
+    return len(window)
+
+
+def per_block(samples, clock, block_size, batch):
+    ring = RingBuffer(len(samples), 3)
+    reader = ring.add_consumer('bench')
+    block = np.empty((block_size, 3), dtype=np.float64)
+    fill = 0
+    start = 0
+    for i in range(0, len(samples), batch):
+        chunk = samples[i:i + batch]
+        while len(chunk):
+            n = min(len(chunk), block_size - fill)
+            rows = block[fill:fill + n]
+            index = clock.advance(n)
+            if fill == 0:
+                start = index
+            np.multiply(chunk[:n, 1], G, out=rows[:, 0])
+            np.multiply(chunk[:n, 0], G, out=rows[:, 1])
+            np.multiply(chunk[:n, 2], G, out=rows[:, 2])
+            chunk = chunk[n:]
+            fill += n
+            if fill == block_size:
+                ring.put_block(block, clock.time_of(start), clock.rate)
+                fill = 0
+    read = 0
+    while reader.lag >= block_size:
+        read += len(reader.read(block_size)[1])
+    return read
+
+
+if __name__ == "__main__":
+    n_samples = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    samples = np.random.default_rng(0).normal(0, 0.1, (n_samples, 3)).astype(np.float32)
+    rows = [tuple(s) for s in samples.tolist()]
+
+    clock = SampleClock(4000)
+    clock.start()
+    start = time.perf_counter()
+    per_sample(rows, clock)
+    base = (time.perf_counter() - start) / n_samples * 1e6
+    print(f"{'path':<22} {'us/sample':>10} {'speed-up':>9}")
+    print(f"{'per-sample tuples':<22} {base:10.3f} {1:9.1f}")
+
+    for block_size, batch in ((64, 16), (64, 32), (256, 32)):
+        clock = SampleClock(4000)
+        clock.start()
+        start = time.perf_counter()
+        per_block(samples, clock, block_size, batch)
+        cost = (time.perf_counter() - start) / n_samples * 1e6
+        print(f"{f'blocks {block_size}, FIFO {batch}':<22} {cost:10.3f} {base / cost:9.1f}")
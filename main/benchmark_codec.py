@@ -0,0 +1,59 @@
+"""
+Compression ratio and encode/decode throughput of ADXL357_codec, on the raw counts of a
+recording or, without one, on a synthetic 4 kHz vibration signal. Run it on the Pi to
+get numbers for the acquisition host.
+
+    python benchmark_codec.py [recording.adxl] [block size]
+"""
+
+import platform
+import sys
+import time
+import numpy as np
+sys.path.append("../")
+
+from ADXL357 import ADXL357_codec
+from recording import RecordingReader
+
+ODR = 4000
+REPEAT = 5
+
+
+def synthetic(seconds=60):
+    """Running machine at +-40 g: 1x and 2x rotation tones, a bearing tone and sensor noise, in counts"""
+    t = np.arange(int(seconds * ODR)) / ODR
+    rng = np.random.default_rng(0)
+    signal = 1200 * np.sin(2 * np.pi * 30 * t) + 400 * np.sin(2 * np.pi * 60 * t) + 150 * np.sin(2 * np.pi * 870 * t)
+    counts = signal[:, None] * [1.0, 0.6, 0.3] + [0, 0, 12800] + rng.normal(0, 8, (len(t), 3))
+    return np.rint(counts).astype(np.int32)
+
+
+def timed(func, blocks):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        out = [func(b) for b in blocks]
+    return (time.perf_counter() - start) / REPEAT, out
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1].endswith('.adxl'):
+        source = sys.argv[1]
+        counts = RecordingReader(source).read(raw=True)[1].astype(np.int32)
+    else:
+        source = 'synthetic'
+        counts = synthetic()
+    block_size = int(sys.argv[-1]) if sys.argv[-1].isdigit() else 10000
+    blocks = [counts[i:i + block_size] for i in range(0, len(counts), block_size)]
+    n = len(counts)
+    raw_mb = n * 12 / 1e6                   # 3 x int32 per sample
+
+    print(f"{source}: {n} samples, blocks of {block_size}, {platform.machine()} {platform.processor()}")
+    print(f"{'method':<8} {'ratio':>6} {'bytes/sample':>13} {'encode MB/s':>12} {'decode MB/s':>12} "
+          f"{'encode us/sample':>17}")
+    for method in ADXL357_codec.METHODS:
+        encode_s, encoded = timed(lambda b: ADXL357_codec.encode(b, method), blocks)
+        decode_s, decoded = timed(ADXL357_codec.decode, encoded)
+        assert all(np.array_equal(a, b) for a, b in zip(blocks, decoded)), method
+        size = sum(len(e) for e in encoded)
+        print(f"{method:<8} {n * 12 / size:6.2f} {size / n:13.2f} {raw_mb / encode_s:12.1f} "
+              f"{raw_mb / decode_s:12.1f} {encode_s / n * 1e6:17.3f}")
@@ -0,0 +1,57 @@
+"""
+CPU cost per decimation chain at 4 kHz, fed in ring-buffer sized blocks, and the
+response of each chain.
+
+    python benchmark_decimator.py [seconds of data] [block size]
+
+For each set of factors run through one DecimatorBank, prints the CPU per chain
+(shared stages counted in every chain that uses them), the gain of a tone at half
+the output Nyquist frequency and the level of a tone at 1.2 times it, which would
+alias without the filter.
+"""
+
+import sys
+import time
+import numpy as np
+
+from decimator import DecimatorBank
+from config import CONFIG
+
+ODR = 4000
+FACTOR_SETS = [[4], [16], [4, 16], [4, 16, 80], [2, 4, 8, 16, 32]]
+
+
+def tone(seconds, frequency):
+    """(x, y, z) samples with a unit sine on every axis"""
+    x = np.sin(2 * np.pi * frequency * np.arange(int(seconds * ODR)) / ODR)
+    return np.stack((x, x, x), axis=1)
+
+
+def level(factors, factor, frequency, seconds=10.0):
+    """Output amplitude (from the RMS) of a unit tone, after the filter settles"""
+    out = DecimatorBank(ODR, factors).update(tone(seconds, frequency), 0.0, ODR)[factor][0]
+    return np.sqrt(2 * np.mean(out[len(out) // 2:, 0] ** 2))
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 60
+    block_size = int(sys.argv[2]) if len(sys.argv) > 2 else CONFIG["BLOCK_SIZE"]
+    data = tone(seconds, 50.0)
+    data += np.random.default_rng(0).normal(0, 1, (len(data), 3))
+
+    print(f"{seconds:g} s at {ODR} Hz in blocks of {block_size}")
+    print(f"{'factors':>18} {'chain':>12} {'Hz':>7} {'us/sample':>10} {'core %':>7} {'gain':>6} {'alias dB':>9}")
+    for factors in FACTOR_SETS:
+        bank = DecimatorBank(ODR, factors)
+        wall = time.process_time()
+        for i in range(0, len(data), block_size):
+            bank.update(data[i:i + block_size], i / ODR, ODR)
+        wall = time.process_time() - wall
+        for factor, cpu in bank.chain_cpu().items():
+            nyquist = ODR / factor / 2
+            gain = level(factors, factor, 0.5 * nyquist)
+            alias = level(factors, factor, 1.2 * nyquist)
+            chain = '>'.join(str(f) for f in bank.chain(factor))
+            print(f"{str(factors):>18} {chain:>12} {ODR / factor:7g} {cpu / len(data) * 1e6:10.3f} "
+                  f"{100 * cpu / seconds:7.2f} {gain:6.3f} {20 * np.log10(alias + 1e-12):9.1f}")
+        print(f"{'':>18} {'whole bank':>12} {'':>7} {wall / len(data) * 1e6:10.3f} {100 * wall / seconds:7.2f}")
@@ -0,0 +1,79 @@
+"""
+Write latency and write amplification of the recording fsync policies.
+
+    python benchmark_fsync.py [seconds per setting] [samples per chunk] [encoding] [folder]
+
+Chunks of 4 kHz data are written in real time through SegmentedRecorder. Run it on
+the SD card of the Pi (folder argument) for meaningful numbers. Write amplification
+is the bytes the block device received (from /sys/dev/block, after a final sync)
+over the bytes of the recording; other processes writing to the same device at the
+same time inflate it.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+from recording import SegmentedRecorder
+
+ODR = 4000
+SCALE = 9.80665 / 12800
+SETTINGS = [(0, 0), (5.0, 0), (1.0, 0), (0, 4), (0, 1)]     # (fsync_interval, fsync_blocks)
+
+
+def device_bytes_written(folder):
+    """Bytes written to the block device holding folder, None if not available"""
+    st = os.stat(folder)
+    path = f"/sys/dev/block/{os.major(st.st_dev)}:{os.minor(st.st_dev)}/stat"
+    try:
+        with open(path) as f:
+            return int(f.read().split()[6]) * 512
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def run(folder, seconds, chunk, encoding, fsync_interval, fsync_blocks):
+    name = f"bench_{fsync_interval}_{fsync_blocks}"
+    counts = np.rint(np.random.default_rng(0).normal(0, 200, (chunk, 3)))
+    os.sync()
+    before = device_bytes_written(folder)
+    latency = []
+    with SegmentedRecorder(folder, name, fsync_interval=fsync_interval, fsync_blocks=fsync_blocks,
+                           encoding=encoding, odr=ODR) as rec:
+        start = time.monotonic()
+        for i in range(int(seconds * ODR / chunk)):
+            due = start + i * chunk / ODR
+            time.sleep(max(due - time.monotonic(), 0))
+            t = time.perf_counter()
+            rec.write_block(i * chunk, i * chunk / ODR, counts, SCALE)
+            latency.append((time.perf_counter() - t) * 1000)
+    os.sync()
+    after = device_bytes_written(folder)
+    size = sum(os.path.getsize(os.path.join(folder, f)) for f in os.listdir(folder) if f.startswith(name))
+    for f in os.listdir(folder):
+        if f.startswith(name):
+            os.remove(os.path.join(folder, f))
+    amplification = (after - before) / size if before is not None else float('nan')
+    return rec.fsyncs, np.percentile(latency, 50), np.percentile(latency, 99), max(latency), amplification
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 15
+    chunk = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    encoding = sys.argv[3] if len(sys.argv) > 3 else 'zlib'
+    folder = sys.argv[4] if len(sys.argv) > 4 else tempfile.mkdtemp(dir='.')
+    os.makedirs(folder, exist_ok=True)
+
+    print(f"{seconds:g} s per setting, chunks of {chunk} samples, {encoding}, in {os.path.abspath(folder)}")
+    print(f"{'fsync every':<14} {'fsyncs':>6} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7} {'write amp':>9}")
+    for fsync_interval, fsync_blocks in SETTINGS:
+        if fsync_blocks:
+            label = f"{fsync_blocks} chunks"
+        elif fsync_interval:
+            label = f"{fsync_interval:g} s"
+        else:
+            label = "never (OS)"
+        fsyncs, p50, p99, worst, amp = run(folder, seconds, chunk, encoding, fsync_interval, fsync_blocks)
+        print(f"{label:<14} {fsyncs:6d} {p50:7.2f} {p99:7.2f} {worst:7.2f} {amp:9.2f}")
@@ -0,0 +1,100 @@
+"""
+CPU cost and accuracy of the order tracking stage at 4 kHz, fed in ring-buffer
+sized blocks, against taking the same orders from a full FFT of every output window, collected
+block by block the same way.
+
+    python benchmark_orders.py [seconds of data] [block size]
+
+The test signal runs at 29.7 Hz, then at 45 Hz for the second half; the tracker is
+re-tuned at the switch like the running frequency tag would do.
+"""
+
+import sys
+import time
+import numpy as np
+
+from order_tracking import OrderTracker
+from config import CONFIG
+
+ODR = 4000
+F1, F2 = 29.7, 45.0
+# Peak amplitude per order (rows) and axis (columns), m/s2
+AMPLITUDES = np.array([[1.5, 0.2, 0.0],
+                       [0.4, 0.0, 0.1],
+                       [0.0, 0.3, 0.0],
+                       [0.05, 0.0, 0.0]])
+
+
+def test_signal(seconds, orders):
+    """Orders of F1 then F2 with AMPLITUDES and a 30 degree phase step per order, plus
+    0.05 m/s2 RMS noise. Returns the samples and the sample where F2 starts"""
+    n = int(seconds * ODR)
+    switch = n // 2
+    f = np.where(np.arange(n) < switch, F1, F2)
+    angle = 2 * np.pi * (np.cumsum(f) - f) / ODR
+    data = np.random.default_rng(0).normal(0, 0.05, (n, 3))
+    for i, k in enumerate(orders):
+        data += np.cos(k * angle + np.radians(30 * k))[:, None] * AMPLITUDES[i]
+    return data, switch
+
+
+def fft_orders(data, block_size, tracker_outputs, orders):
+    """Same outputs from an FFT of each output window, collected block by block like a
+    streaming stage would, orders read at the nearest bin"""
+    ends = iter(count for count, _, _, _ in tracker_outputs)
+    frequencies = iter(frequency for _, frequency, _, _ in tracker_outputs)
+    end = next(ends)
+    pending = []
+    seen = 0
+    amplitudes = []
+    for i in range(0, len(data), block_size):
+        block = data[i:i + block_size]
+        while seen + len(block) >= end:
+            pending.append(block[:end - seen])
+            block = block[end - seen:]
+            seen = end
+            window = np.concatenate(pending)
+            spectrum = np.fft.rfft(window, axis=0)
+            bins = np.rint(np.asarray(orders) * next(frequencies) * len(window) / ODR).astype(int)
+            amplitudes.append(2 * np.abs(spectrum[bins]) / len(window))
+            pending = []
+            end = next(ends, len(data) + 1)
+        pending.append(block)
+        seen += len(block)
+    return amplitudes
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 60
+    block_size = int(sys.argv[2]) if len(sys.argv) > 2 else CONFIG["BLOCK_SIZE"]
+    orders = CONFIG["ORDERS"]
+    data, switch = test_signal(seconds, orders)
+
+    tracker = OrderTracker(ODR, F1, orders, CONFIG["ORDERS_INTERVAL"])
+    outputs = []
+    cpu = time.process_time()
+    for i in range(0, len(data), block_size):
+        if i >= switch:
+            tracker.set_frequency(F2)
+        outputs += tracker.update(data[i:i + block_size])
+    tracker_cpu = time.process_time() - cpu
+
+    cpu = time.process_time()
+    fft_amplitudes = fft_orders(data, block_size, outputs, orders)
+    fft_cpu = time.process_time() - cpu
+
+    # Outputs entirely at one frequency; the one spanning the switch mixes both
+    steady = [i for i, (count, frequency, _, _) in enumerate(outputs)
+              if count <= switch or count - tracker.length >= switch + block_size]
+    error = max(np.abs(outputs[i][2] - AMPLITUDES).max() for i in steady)
+    fft_error = max(np.abs(fft_amplitudes[i] - AMPLITUDES).max() for i in steady)
+    phase = outputs[steady[0]][3][:, 0]
+
+    print(f"{seconds:g} s at {ODR} Hz in blocks of {block_size}, orders {orders}, "
+          f"{len(outputs)} outputs of ~{CONFIG['ORDERS_INTERVAL']} s")
+    print(f"{'':>14} {'us/sample':>10} {'core %':>7} {'max amp err':>12}")
+    print(f"{'order tracker':>14} {tracker_cpu / len(data) * 1e6:10.3f} {100 * tracker_cpu / seconds:7.2f} {error:12.4f}")
+    print(f"{'FFT per output':>14} {fft_cpu / len(data) * 1e6:10.3f} {100 * fft_cpu / seconds:7.2f} {fft_error:12.4f}")
+    print(f"x phase of the first output: {np.round(phase[AMPLITUDES[:, 0] > 0], 1)} deg, "
+          f"expected {[30 * k for k, a in zip(orders, AMPLITUDES[:, 0]) if a > 0]}")
+    print(f"frequency after the switch: {outputs[-1][1]} Hz")
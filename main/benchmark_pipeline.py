@@ -0,0 +1,144 @@
+"""
+End-to-end benchmark of the VibrationMonitor pipeline (sampling, RMS/PLC and
+saving tasks) against the simulated ADXL357 and a stand-in PLC client.
+
+Usage: python benchmark_pipeline.py <plc_config_file>.py [seconds_per_odr] [output.json]
+
+Each ODR runs for at least four blocks. Dropped samples are the ones lost to
+FIFO overruns, which the time axis skips.
+"""
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+sys.path.append("../")
+
+from ADXL357 import ADXL357, ADXL357_simulator
+from ADXL357.ADXL357_definitions import ODR_TO_BIT
+from vibration_monitor import VibrationMonitor
+from config import CONFIG
+from plc_standin import StandInPLC
+from plc_interface import load_plc_config
+
+
+def thread_cpu(thread):
+    """User + system CPU seconds of a running thread (Linux)"""
+    try:
+        with open(f"/proc/self/task/{thread.native_id}/stat") as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+    except OSError:
+        return None
+
+
+def percentiles(values):
+    if not values:
+        return None
+    p = np.percentile(values, [50, 90, 99, 100])
+    return {'p50': p[0], 'p90': p[1], 'p99': p[2], 'max': p[3]}
+
+
+def bench_odr(plc_config, odr, duration, folder, plc_write_delay=0.0, min_blocks=4):
+    plc = StandInPLC(load_plc_config(plc_config), write_latency=plc_write_delay)
+    sim = ADXL357_simulator.ADXL357Simulator(noise=0.01, seed=0)
+    sensor = ADXL357.ADXL357(backend=sim, fifo_watermark=CONFIG["FIFO_WATERMARK"])
+
+    monitor = VibrationMonitor(plc_config, sensor=sensor, plc_client=plc)
+    startup_requests = plc.requests
+    monitor.sampling_rate = odr
+    sensor.setfilter(odr, 0)
+    monitor.folder_name = folder
+    tasks = {'sampling': monitor.sampling_task,
+             'rms_plc': monitor.rms_and_plc_task,
+             'saving': monitor.data_saving_task}
+    if monitor.decimation_factors:
+        tasks['decimation'] = monitor.decimation_task
+    if monitor.spectrum_enabled:
+        tasks['spectrum'] = monitor.spectrum_task
+    if monitor.orders_enabled:
+        tasks['orders'] = monitor.order_tracking_task
+    threads = {name: threading.Thread(target=task, daemon=True) for name, task in tasks.items()}
+    for thread in threads.values():
+        thread.start()
+
+    # Long enough for a few blocks to go through at low ODRs
+    duration = max(duration, min_blocks * monitor.block_size / odr)
+    depth = []
+    start = time.time()
+    while time.time() - start < duration:
+        depth.append((round(time.time() - start, 2), max(c.lag for c in monitor.data_ring.consumers)))
+        time.sleep(0.1)
+    cpu = {name: thread_cpu(thread) for name, thread in threads.items()}
+    elapsed = time.time() - start
+    produced = sim.produced
+    acquired = monitor.sample_count
+    monitor.stop_event.set()
+    sensor.stop()
+    for thread in threads.values():
+        thread.join(timeout=2)
+    monitor.plc.stop_publisher()
+
+    t0 = monitor.clock.t0_ns / 1e9
+    latency = [(w - t0 - v[0]) * 1000 for w, v in plc.rms_writes]
+    return {'odr': odr,
+            'duration_s': elapsed,
+            'samples_acquired': acquired,
+            'samples_produced': produced,
+            'sample_rate_hz': acquired / elapsed,
+            'dropped': monitor.samples_lost,
+            'drdy_missed': sensor.drdy_missed,
+            'fifo_overruns': monitor.fifo_overruns,
+            'clock_rate_hz': monitor.clock.rate,
+            'clock_drift_ppm': monitor.clock.drift_ppm,
+            'queue_depth': depth,
+            'queue_depth_max': max(d for _, d in depth),
+            'consumers': monitor.data_ring.stats(),
+            'cpu_s': cpu,
+            'decimation_cpu_s': monitor.decimator.chain_cpu() if monitor.decimator else None,
+            'decimated_consumers': {f: ring.stats() for f, ring in monitor.decimated_rings.items()},
+            'plc_writes': len(plc.rms_writes),
+            'publisher': monitor.plc.publish_stats(),
+            'plc_startup_requests': startup_requests,
+            'plc_requests_per_s': plc.requests / elapsed,
+            'latency_ms': percentiles(latency)}
+
+
+def version():
+    try:
+        return subprocess.check_output(['git', 'describe', '--always', '--dirty'],
+                                       text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# --- Main Execution ---
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python benchmark_pipeline.py <plc_config_file>.py [seconds_per_odr] [output.json]")
+        sys.exit(1)
+    plc_config_file = sys.argv[1]
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    output = sys.argv[3] if len(sys.argv) > 3 else "benchmark_pipeline.json"
+
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        for odr in ODR_TO_BIT:
+            r = bench_odr(plc_config_file, odr, duration, folder)
+            results.append(r)
+            p99 = 'n/a' if r['latency_ms'] is None else f"{r['latency_ms']['p99']:.1f} ms"
+            print(f"ODR {odr:>8} Hz: {r['sample_rate_hz']:8.1f} samples/s, dropped {r['dropped']}, "
+                  f"max queue {r['queue_depth_max']}, p99 latency {p99}")
+
+    report = {'version': version(),
+              'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'platform': platform.platform(),
+              'python': platform.python_version(),
+              'results': results}
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {output}")
@@ -0,0 +1,34 @@
+"""
+Acquisition and RMS publishing against a PLC that gets slower, up to a stall.
+
+    python benchmark_publisher.py <plc_config_file>.py [seconds per setting]
+
+With the background publisher the sample rate and the RMS task must not depend on
+the PLC write time: slow writes only drop intermediate RMS values.
+"""
+
+import sys
+import tempfile
+
+from benchmark_pipeline import bench_odr
+
+WRITE_DELAYS = (0.0, 0.01, 0.05, 0.5, 5.0)     # Seconds per PLC write, the last one is a stall
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python benchmark_publisher.py <plc_config_file>.py [seconds per setting]")
+        sys.exit(1)
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+
+    rows = []
+    with tempfile.TemporaryDirectory() as folder:
+        for delay in WRITE_DELAYS:
+            r = bench_odr(sys.argv[1], 4000, duration, folder, plc_write_delay=delay)
+            rows.append((delay, r))
+
+    print(f"\n{'PLC write':>10} {'samples/s':>10} {'RMS lag':>8} {'published':>10} {'dropped':>8} {'p50 ms':>8}")
+    for delay, r in rows:
+        pub = r['publisher']
+        p50 = pub['latency_ms']['p50'] if 'latency_ms' in pub else float('nan')
+        print(f"{1000 * delay:8.0f}ms {r['sample_rate_hz']:10.1f} {r['consumers']['rms']['lag']:8d} "
+              f"{pub['published']:10d} {pub['dropped']:8d} {p50:8.1f}")
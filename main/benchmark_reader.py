@@ -0,0 +1,67 @@
+"""
+Time to extract a 1 s window from a large recording, and the reader's memory use.
+
+    python benchmark_reader.py [size in GB] [encoding] [folder]
+
+Writes a synthetic 4 kHz recording of the given size, then reads 1 s windows at
+random positions through the memory-mapped reader.
+"""
+
+import os
+import resource
+import sys
+import tempfile
+import time
+import numpy as np
+
+from recording import RecordingWriter, RecordingReader
+
+ODR = 4000
+CHUNK = 10000                           # Samples per block, as SAVE_INTERVAL
+SCALE = 9.80665 / 12800
+WINDOWS = 50
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def write(path, size_gb, encoding):
+    rng = np.random.default_rng(0)
+    counts = np.rint(rng.normal(0, 200, (CHUNK, 3)))
+    with RecordingWriter(path, encoding=encoding, odr=ODR) as rec:
+        index = 0
+        while rec.offset < size_gb * 1e9:
+            rec.write_block(index, index / ODR, counts, SCALE)
+            index += CHUNK
+    return index
+
+
+if __name__ == "__main__":
+    size_gb = float(sys.argv[1]) if len(sys.argv) > 1 else 1
+    encoding = sys.argv[2] if len(sys.argv) > 2 else 'none'
+    folder = sys.argv[3] if len(sys.argv) > 3 else tempfile.mkdtemp()
+    path = os.path.join(folder, 'bench.adxl')
+
+    samples = write(path, size_gb, encoding)
+    duration = samples / ODR
+    print(f"{os.path.getsize(path) / 1e9:.2f} GB, {encoding}, {duration / 3600:.2f} h at {ODR} Hz")
+
+    rss = max_rss_mb()
+    start = time.perf_counter()
+    rec = RecordingReader(path)
+    open_ms = (time.perf_counter() - start) * 1000
+
+    rng = np.random.default_rng(1)
+    times = []
+    for t0 in rng.uniform(0, duration - 1, WINDOWS):
+        start = time.perf_counter()
+        t, data = rec.read_range(t0, t0 + 1)
+        float(data.sum())                   # Touch the samples
+        times.append((time.perf_counter() - start) * 1000)
+    rec.close()
+    os.remove(path)
+
+    print(f"open {open_ms:.2f} ms, {len(times)} windows of 1 s: median {np.median(times):.2f} ms, "
+          f"max {np.max(times):.2f} ms")
+    print(f"max RSS growth while reading: {max_rss_mb() - rss:.1f} MB")
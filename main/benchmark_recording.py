@@ -0,0 +1,85 @@
+"""
+File size and write/read throughput of the binary recording format against the CSV
+files previously written by data_saving_task.
+
+    python benchmark_recording.py [seconds of data at 4 kHz] [folder]
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+from recording import RecordingWriter, RecordingReader
+
+ODR = 4000
+CHUNK = 10000                           # Samples per write, as SAVE_INTERVAL
+SCALE = 9.80665 / 12800                 # m/s2 per count at +-40 g
+
+
+def make_data(seconds):
+    """(t, x, y, z) rows as the CSV files held them, 20-bit counts scaled to m/s2 at +-40 g.
+    The binary writers only take t of the first row of each chunk"""
+    n = int(seconds * ODR)
+    rng = np.random.default_rng(0)
+    counts = np.round(rng.normal(0, 2000, (n, 3)) + 6000 * np.sin(np.arange(n) / ODR * 2 * np.pi * 50)[:, None])
+    rows = np.empty((n, 4))
+    rows[:, 0] = np.arange(n) / ODR
+    rows[:, 1:] = counts * SCALE
+    return rows
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["timestamp", "accel_x", "accel_y", "accel_z"])
+        for i in range(0, len(rows), CHUNK):
+            writer.writerows(rows[i:i + CHUNK].tolist())
+            file.flush()
+
+
+def read_csv(path):
+    return np.loadtxt(path, delimiter=',', skiprows=1)
+
+
+def write_binary(path, rows, encoding='none'):
+    with RecordingWriter(path, encoding=encoding, odr=ODR) as rec:
+        for i in range(0, len(rows), CHUNK):
+            if encoding == 'none':
+                rec.write_block(i, rows[i, 0], rows[i:i + CHUNK, 1:])
+            else:
+                rec.write_block(i, rows[i, 0], np.rint(rows[i:i + CHUNK, 1:] / SCALE), SCALE)
+            rec.flush()
+
+
+def read_binary(path):
+    return RecordingReader(path).read()
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 60
+    folder = sys.argv[2] if len(sys.argv) > 2 else tempfile.mkdtemp()
+    rows = make_data(seconds)
+    n = len(rows)
+
+    print(f"{n} samples ({seconds:g} s at {ODR} Hz)")
+    print(f"{'format':<8} {'bytes/sample':>12} {'MB':>8} {'write MB/s':>11} {'write us/sample':>16} {'read s':>7}")
+    formats = [('csv', 'csv', write_csv, read_csv, ())]
+    formats += [(encoding, 'adxl', write_binary, read_binary, (encoding,))
+                for encoding in ('none', 'packed', 'zlib', 'lzma')]
+    for name, ext, write, read, args in formats:
+        path = os.path.join(folder, f"bench.{ext}")
+        write_s = timed(write, path, rows, *args)
+        read_s = timed(read, path)
+        size = os.path.getsize(path)
+        print(f"{name:<8} {size / n:12.1f} {size / 1e6:8.1f} {size / 1e6 / write_s:11.1f} "
+              f"{write_s / n * 1e6:16.2f} {read_s:7.2f}")
+        os.remove(path)
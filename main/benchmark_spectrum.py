@@ -0,0 +1,45 @@
+"""
+CPU cost of the streaming Welch stage at 4 kHz, fed in ring-buffer sized blocks.
+
+    python benchmark_spectrum.py [seconds of data] [block size]
+
+Prints the share of one core needed to keep up in real time for a few segment
+lengths, and checks band power and peak frequency on a known test signal.
+"""
+
+import sys
+import time
+import numpy as np
+
+from spectrum import StreamingWelch
+from config import CONFIG
+
+ODR = 4000
+
+
+def test_signal(seconds):
+    """x: 2 m/s2 at 123.4 Hz, y: 1 m/s2 at 870 Hz, z: white noise of 1 m/s2 RMS"""
+    t = np.arange(int(seconds * ODR)) / ODR
+    noise = np.random.default_rng(0).normal(0, 1, len(t))
+    return np.stack((2 * np.sin(2 * np.pi * 123.4 * t), np.sin(2 * np.pi * 870 * t), noise), axis=1)
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 60
+    block_size = int(sys.argv[2]) if len(sys.argv) > 2 else CONFIG["BLOCK_SIZE"]
+    data = test_signal(seconds)
+
+    print(f"{seconds:g} s at {ODR} Hz in blocks of {block_size}")
+    print(f"{'nperseg':>8} {'us/sample':>10} {'core %':>7} {'x peak Hz':>10} {'x power':>8} {'z power':>8}")
+    for nperseg in (256, 1024, 4096):
+        welch = StreamingWelch(ODR, nperseg, CONFIG["SPECTRUM_OVERLAP"], CONFIG["SPECTRUM_INTERVAL"],
+                               [(0, ODR / 2)], n_peaks=1)
+        results = []
+        cpu = time.process_time()
+        for i in range(0, len(data), block_size):
+            results += welch.update(data[i:i + block_size])
+        cpu = time.process_time() - cpu
+        last = results[-1][1]
+        print(f"{nperseg:8d} {cpu / len(data) * 1e6:10.3f} {100 * cpu / seconds:7.2f} "
+              f"{last['peak_hz'][0, 0]:10.2f} {last['bands'][0, 0]:8.3f} {last['bands'][0, 2]:8.3f}")
+    print("expected: x peak 123.40 Hz, x power 2.000, z power 1.000 (m/s2)^2")
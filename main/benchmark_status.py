@@ -0,0 +1,77 @@
+"""
+PLC request rate, CPU use and stop detection delay of the VDF status check: the
+previous busy loop of run() against StatusWatcher.
+
+    python benchmark_status.py <plc_config_file>.py [seconds] [PLC read time in ms]
+
+The stand-in PLC reports the VDF running (2) for the given time, then stopped (0).
+"""
+
+import sys
+import threading
+import time
+
+from plc_standin import StandInPLC
+from plc_interface import PLCInterface, load_plc_config
+from status_watcher import StatusWatcher
+from config import CONFIG
+
+
+def busy_loop(plc, tag, stopped):
+    """run() before the status watcher: check_if_running() back to back"""
+    vdf_running = False
+    while True:
+        value = plc.read_plc_tag(tag)
+        if value == 2:
+            vdf_running = True
+        if vdf_running and value != 2:
+            stopped.set()
+            return
+
+
+def watcher(plc, tag, stopped):
+    def on_change(old, value):
+        if old == 2 and value != 2:
+            stopped.set()
+    watch = StatusWatcher(plc, tag, CONFIG["STATUS_FAST_INTERVAL"], CONFIG["STATUS_SLOW_INTERVAL"],
+                          CONFIG["STATUS_FAST_PERIOD"])
+    watch.on_change(on_change)
+    watch.start()
+    stopped.wait()
+    watch.stop()
+
+
+def measure(check, plc_config, duration, read_delay):
+    config = load_plc_config(plc_config)
+    client = StandInPLC(config, read_latency=read_delay, vdf_script=[(0, 2), (duration, 0)])
+    plc = PLCInterface(plc_config, client)
+    tag = config['VDF_STATUS']
+    stopped = threading.Event()
+    thread = threading.Thread(target=check, args=(plc, tag, stopped), daemon=True)
+
+    cpu = time.process_time()
+    client.start()
+    thread.start()
+    time.sleep(duration)                    # The VDF stops at the end of the script
+    requests = client.requests
+    cpu = time.process_time() - cpu
+    elapsed = time.monotonic() - client.t0
+
+    stopped.wait()
+    delay = time.monotonic() - (client.t0 + duration)
+    thread.join()
+    return requests / elapsed, 100 * cpu / elapsed, 1000 * delay
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python benchmark_status.py <plc_config_file>.py [seconds] [PLC read time in ms]")
+        sys.exit(1)
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+    read_delay = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.002
+
+    results = [(name, measure(check, sys.argv[1], duration, read_delay))
+               for name, check in (('busy loop', busy_loop), ('watcher', watcher))]
+    print(f"\n{'status check':<12} {'requests/s':>11} {'CPU %':>6} {'stop detected after':>20}")
+    for name, (rate, cpu, delay) in results:
+        print(f"{name:<12} {rate:11.1f} {cpu:6.1f} {delay:17.1f} ms")
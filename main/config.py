@@ -2,9 +2,42 @@ CONFIG = {
     "HOST": "192.168.168.32",
     "PORT": 65410,
     "SAMPLING_RATE": 4000,  # Hz
-    "WINDOW_SIZE": 200,  # Samples for RMS calculation
+    "WINDOW_SIZE": 200,  # Full-rate samples for RMS calculation (value sent to the PLC)
+    "RMS_WINDOWS": [4000],  # Additional RMS window lengths in full-rate samples, checked against THRESHOLD
+    "RMS_HOP": 200,  # Full-rate samples between RMS updates (divided by RMS_DECIMATION for the RMS stream)
     "SAVE_INTERVAL": 10000,  # Samples per chunk
+    "RECORD_ENCODING": "zlib",  # Recording codec: none (float32), zlib, lzma or packed (raw counts)
+    "SEGMENT_SECONDS": 600,  # New recording segment after this many seconds...
+    "SEGMENT_MB": 256,  # ...or this many MB
+    "FSYNC_INTERVAL": 5.0,  # Seconds between fsyncs of the recording, 0 to leave it to the OS
+    "FSYNC_BLOCKS": 0,  # Chunks between fsyncs, 0 to only use FSYNC_INTERVAL
+    "BLOCK_SIZE": 64,  # Samples per block passed between tasks
+    "FIFO_WATERMARK": 16,  # Samples per sensor FIFO read
     "PLC_UPDATE_INTERVAL": 0.0001,  # Seconds between RMS updates
+    "PLC_SESSIONS": 1,  # PLC connections shared by the RMS, status and heartbeat tasks
+    "RMS_DEADBAND": 0.05,  # m/s2 change of any axis RMS that is sent to the PLC...
+    "RMS_DEADBAND_REL": 0.02,  # ...or relative change
+    "PLC_MIN_INTERVAL": 0.05,  # Seconds between RMS writes, at least
+    "PLC_MAX_INTERVAL": 1.0,  # Seconds between RMS writes, at most (keep-alive)
+    "STATUS_FAST_INTERVAL": 0.05,  # Seconds between VDF status reads around transitions...
+    "STATUS_SLOW_INTERVAL": 0.5,  # ...and at most while the status does not change
+    "STATUS_FAST_PERIOD": 2.0,  # Seconds of fast polling after start and after a change
+    "SPECTRUM_ENABLED": True,  # Welch PSD stage: band powers and peak frequencies per axis
+    "SPECTRUM_NPERSEG": 1024,  # Samples per FFT segment
+    "SPECTRUM_OVERLAP": 0.5,  # Fraction of a segment shared with the next one
+    "SPECTRUM_INTERVAL": 1.0,  # Seconds between spectrum updates
+    "SPECTRUM_BANDS": [[10, 100], [100, 500], [500, 1000], [1000, 2000]],  # Hz
+    "SPECTRUM_PEAKS": 3,  # Peak frequencies per axis
+    "ORDERS_ENABLED": True,  # Amplitude and phase of multiples of the running frequency per axis
+    "ORDERS": [1, 2, 3, 4],  # Multiples of the running frequency to track
+    "ORDERS_INTERVAL": 0.5,  # Seconds per output, rounded to whole revolutions
+    "FREQUENCY_POLL_INTERVAL": 1.0,  # Seconds between reads of the running frequency tag
+    "DECIMATION_FACTORS": [4, 16],  # Decimated streams (ODR / factor) the consumers can read instead of the full rate
+    "RMS_DECIMATION": 1,  # Stream of each consumer: 1 for the full rate, else one of the factors (RMS lengths
+                          # above stay in full-rate samples and are converted)
+    "SPECTRUM_DECIMATION": 1,
+    "ORDERS_DECIMATION": 1,  # Above 1 only if max(ORDERS) x the running frequency stays below 0.4 x ODR / factor
+    "SHUTDOWN_TIMEOUT": 10.0,  # Seconds the tasks get to finish (save the rest and close the recording) on shutdown
     "THRESHOLD": 100.0,  # Acceleration threshold for alerts
     "TESTING": True,  # Set to False for actual PLC operation
     "FOLDER_NAME": "data_060325"
@@ -0,0 +1,97 @@
+import time
+import numpy as np
+
+
+class Decimator:
+    """Anti-aliased decimation of (n, channels) sample blocks by an integer factor.
+
+    A linear-phase FIR low-pass (Kaiser windowed sinc, `taps_per_phase` taps per
+    polyphase branch, -6 dB at `cutoff` times the output Nyquist frequency) is
+    evaluated only at the kept outputs, which is the arithmetic of a polyphase
+    filter: taps_per_phase multiply-adds per input sample and channel. The last
+    taps - 1 input rows are kept, so blocks of any size give the same output as one
+    long block. A block comes with the time of its first sample and its rate, and the
+    output block gets its own, moved back by the filter delay.
+    """
+
+    def __init__(self, rate, factor, channels=3, taps_per_phase=24, cutoff=0.9, beta=8.0):
+        self.rate = rate
+        self.factor = factor
+        self.channels = channels
+        self.taps = taps_per_phase * factor + 1
+        n = np.arange(self.taps) - (self.taps - 1) / 2
+        fc = cutoff * 0.5 / factor                  # Cycles per input sample
+        h = np.sinc(2 * fc * n) * np.kaiser(self.taps, beta)
+        self.h = h / h.sum()                        # Unity gain at DC; symmetric, so no reversal
+        self.delay = (self.taps - 1) / 2            # Input samples
+        self.history = None                         # Last taps - 1 input samples
+        self.start = 0                              # Position in history + block of the next output window
+
+    def update(self, values, t, rate):
+        """Add an (n, channels) block whose first sample is at time t, returns the (m, channels)
+        decimated samples it completes, the time of the first one and their rate"""
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return np.empty((0, self.channels)), t, rate / self.factor
+        if self.history is None:
+            # Start from a settled filter: history holds copies of the first sample
+            self.history = np.repeat(values[:1], self.taps - 1, axis=0)
+        data = np.concatenate((self.history, values))
+        n = (len(data) - self.taps - self.start) // self.factor + 1 if len(data) >= self.taps + self.start else 0
+        # (n, channels, taps) windows, one per output
+        windows = np.lib.stride_tricks.sliding_window_view(data, self.taps, axis=0)[self.start::self.factor][:n]
+        out = windows @ self.h
+        # The newest sample of the first window is row `start` of this block
+        t_out = t + (self.start - self.delay) / rate
+        self.start += n * self.factor - len(values)
+        self.history = data[len(data) - (self.taps - 1):]
+        return out, t_out, rate / self.factor
+
+
+class DecimatorBank:
+    """Decimated copies of one stream at several integer factors at once.
+
+    Factors are reached through a cascade of Decimator stages of at most `max_factor`
+    each, and a factor is derived from the largest one below it that divides it, so
+    e.g. 4 and 16 share the first stage. CPU time is measured per stage; chain_cpu()
+    adds up the stages behind one output.
+    """
+
+    def __init__(self, rate, factors, channels=3, max_factor=8, **filter_args):
+        self.rate = rate
+        self.factors = sorted(set(int(f) for f in factors))
+        if not self.factors or self.factors[0] < 1:
+            raise ValueError(f"Decimation factors must be integers >= 1, got {factors}")
+        self.stages = {}                            # Output factor: (source factor, Decimator)
+        for factor in self.factors:
+            source = max(g for g in [1] + list(self.stages) if factor % g == 0)
+            while source != factor:
+                step = factor // source
+                # Largest divisor of the remaining step that fits in one stage
+                split = max([d for d in range(2, min(step, max_factor) + 1) if step % d == 0] or [step])
+                self.stages[source * split] = (source, Decimator(rate / source, split, channels, **filter_args))
+                source *= split
+        self.stages = dict(sorted(self.stages.items()))
+        self.cpu = {factor: 0.0 for factor in self.stages}     # Thread CPU seconds per stage
+
+    def update(self, values, t, rate):
+        """Add a full-rate block starting at time t, returns {factor: (samples, time of the
+        first one, rate)} for the requested factors"""
+        outputs = {1: (values, t, rate)}
+        for factor, (source, stage) in self.stages.items():
+            cpu = time.thread_time()
+            outputs[factor] = stage.update(*outputs[source])
+            self.cpu[factor] += time.thread_time() - cpu
+        return {factor: outputs[factor] for factor in self.factors}
+
+    def chain(self, factor):
+        """Stage factors from the full rate to `factor`"""
+        chain = []
+        while factor != 1:
+            chain.append(factor)
+            factor = self.stages[factor][0]
+        return chain[::-1]
+
+    def chain_cpu(self):
+        """CPU seconds per requested factor, including the stages it shares with others"""
+        return {factor: sum(self.cpu[f] for f in self.chain(factor)) for factor in self.factors}
@@ -0,0 +1,69 @@
+import numpy as np
+
+MAX_FRACTION = 0.4  # Highest order frequency tracked, as a fraction of the sample rate
+
+
+class OrderTracker:
+    """Amplitude and phase of the orders (multiples) of the drive frequency, per axis.
+
+    Each order is a single-bin DFT (what a Goertzel filter computes) accumulated block
+    by block: the samples are multiplied by a complex phasor at the order frequency and
+    summed. An output covers a whole number of drive revolutions close to `interval`
+    seconds, so every order falls exactly on a bin and there is no leakage between
+    them. set_frequency() re-tunes the bank from the next output on. Orders at or above
+    `max_fraction` of the sample rate are too close to Nyquist for the stream they are
+    read from (aliased or in the anti-aliasing roll-off) and come out as NaN.
+    """
+
+    def __init__(self, rate, frequency, orders=(1, 2, 3, 4), interval=0.5, channels=3, max_fraction=MAX_FRACTION):
+        self.rate = rate
+        self.max_fraction = max_fraction
+        self.orders = np.asarray(orders, dtype=np.float64)
+        self.interval = interval
+        self.channels = channels
+        self.next_frequency = frequency
+        self.count = 0                          # Samples seen
+        self.start_window()
+
+    def set_frequency(self, frequency):
+        self.next_frequency = frequency
+
+    def start_window(self):
+        self.frequency = float(self.next_frequency or 0)
+        if self.frequency > 0:
+            cycles = max(round(self.interval * self.frequency), 1)
+            self.length = max(round(cycles * self.rate / self.frequency), 1)
+        else:
+            self.length = max(round(self.interval * self.rate), 1)
+        self.omega = 2 * np.pi * self.orders * self.frequency / self.rate
+        self.valid = self.orders * self.frequency < self.max_fraction * self.rate
+        # Real and imaginary parts of the phasor of every order for every sample of the
+        # window, stacked as (2 * orders, length) so a block takes one real matrix product
+        angle = np.outer(self.omega, np.arange(self.length))
+        self.phasors = np.ascontiguousarray(np.concatenate((np.cos(angle), -np.sin(angle))))
+        self.acc = np.zeros((2 * len(self.orders), self.channels))
+        self.pos = 0                            # Samples in the current window
+
+    def update(self, block):
+        """Add an (n, channels) block, returns a list of (sample count, frequency,
+        amplitude, phase) with (orders, channels) amplitude (peak, block units) and
+        phase (degrees, against the start of the output window)"""
+        block = np.asarray(block, dtype=np.float64)
+        results = []
+        while len(block):
+            m = min(len(block), self.length - self.pos)
+            self.acc += self.phasors[:, self.pos:self.pos + m] @ block[:m]
+            self.pos += m
+            self.count += m
+            block = block[m:]
+            if self.pos == self.length:
+                if self.frequency > 0:
+                    acc = self.acc[:len(self.orders)] + 1j * self.acc[len(self.orders):]
+                    amplitude = 2 * np.abs(acc) / self.length
+                    phase = np.degrees(np.angle(acc))
+                    amplitude[~self.valid] = phase[~self.valid] = np.nan
+                else:
+                    amplitude = phase = np.full((len(self.orders), self.channels), np.nan)
+                results.append((self.count, self.frequency, amplitude, phase))
+                self.start_window()
+        return results
@@ -1,22 +1,114 @@
 import time  # Needed for time.sleep() in toggle_plc_tag()
+import threading  # Needed for the background publisher
+import collections
 import importlib.util  # Needed for dynamic loading of plc_config.py
 from pylogix import PLC  # Needed to communicate with the PLC
 
+WRITE_OVERHEAD = 80  # Approximate EtherNet/IP + CIP bytes of a write request and its reply, besides tag and data
+
+_configs = {}  # Loaded plc_config modules by path
+
+
+class PLCConnection:
+    """ One persistent pylogix session shared by several threads, requests are serialized """
+
+    def __init__(self, ip_address, client=None):
+        self.client = client if client is not None else PLC()
+        self.client.IPAddress = ip_address
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    @property
+    def IPAddress(self):
+        return self.client.IPAddress
+
+    @IPAddress.setter
+    def IPAddress(self, value):
+        self.client.IPAddress = value
+
+    def Read(self, tag, count=1, datatype=None):
+        with self.lock:
+            self.requests += 1
+            return self.client.Read(tag, count, datatype) if datatype else self.client.Read(tag, count)
+
+    def Write(self, tag, value=None):
+        with self.lock:
+            self.requests += 1
+            return self.client.Write(tag, value)
+
+    def Close(self):
+        with self.lock:
+            self.client.Close()
+
+
+class PLCConnectionManager:
+    """ Owns `sessions` connections to one PLC; session(i) hands them out round robin, so
+    with one session every PLCInterface shares the same connection. A given client (a
+    stand-in for tests) is used as the only session """
+
+    def __init__(self, ip_address, sessions=1, client=None):
+        if client is not None:
+            self.connections = [PLCConnection(ip_address, client)]
+        else:
+            self.connections = [PLCConnection(ip_address) for _ in range(sessions)]
+
+    def session(self, i=0):
+        return self.connections[i % len(self.connections)]
+
+    @property
+    def requests(self):
+        return sum(c.requests for c in self.connections)
+
+    def close(self):
+        for connection in self.connections:
+            connection.Close()
+        print("🔌 PLC connections closed.")
+
+
 class PLCInterface:
-    def __init__(self, config_module):
+    def __init__(self, config_module, client=None):
         self._load_config(config_module)
-        self.client = PLC()
+        self.client = client if client is not None else PLC()
         self.client.IPAddress = self.config['IP_ADDRESS']
+
+        # Background publisher: newest value per tag, written by one thread
+        self.pending = {}                   # tag -> (value, time.monotonic() of publish)
+        self.publish_cond = threading.Condition()
+        self.publisher = None
+        self.publisher_stop = False
+        self.published = 0                  # Values written
+        self.dropped = 0                    # Values replaced by a newer one before being written
+        self.failed = 0                     # Writes that did not succeed
+        self.publish_latency = collections.deque(maxlen=1000)  # Seconds from publish() to written
+
+        # Report by exception: tag -> deadband settings, and the last value let through per tag
+        self.deadbands = {}
+        self.last_published = {}            # tag -> (value, time.monotonic()) of the last value written
+        self.suppressed = 0                 # Values not sent because they were within the deadband
+        self.bytes_saved = 0                # Estimated request bytes of the suppressed values
         print(f'PLC Interface initialized with IP: {self.client.IPAddress}')
     
     def _load_config(self, config_module):
-        spec = importlib.util.spec_from_file_location("plc_config", config_module)
-        config = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(config)
-        self.config = config.PLC_CONFIG  # Assumes PLC_CONFIG is a dictionary
-        
+        self.config = load_plc_config(config_module)
+
+    def read_tags(self, tags):
+        """ Reads several tags in one multi-service request, returns their values in order
+        (None for a failed tag). Items can be tag names or (tag, element count) """
+        if not tags:
+            return []
+        responses = self.client.Read(list(tags))
+        return [r.Value if r.Status == 'Success' else None for r in responses]
+
     def read_plc_string_tag(self, tag):
-        """ Reads a STRING (STR) tag from the PLC """        
+        """ Reads a STRING (STR) tag from the PLC, decoded by pylogix in one request """
+        value = self.read_tags([tag])[0]
+        if isinstance(value, str):
+            return value
+        return self.read_plc_string_tag_members(tag)
+
+    def read_plc_string_tag_members(self, tag):
+        """ Reads a STRING tag as its LEN and DATA members, for string types pylogix does
+        not decode: one request per member """
         # Read string length
         length_response = self.client.Read(f"{tag}.LEN")
         
@@ -65,6 +157,108 @@ class PLCInterface:
                 continue
         print(f'Failed to write {value} to {tag} after {retries} attempts')
         
+    def set_deadband(self, tag, absolute=None, relative=None, min_interval=0.0, max_interval=None):
+        """ Only publish a tag when its value changes by more than `absolute` or by more than
+        `relative` times the last published value, at most every `min_interval` seconds and
+        at least every `max_interval` seconds (keep-alive). For list values, absolute and
+        relative can be lists with one entry per element, None to ignore the element """
+        self.deadbands[tag] = {'absolute': absolute, 'relative': relative,
+                               'min_interval': min_interval, 'max_interval': max_interval}
+
+    def changed(self, tag, value, now):
+        """ Whether a value for a tag with a deadband has to be published """
+        band = self.deadbands[tag]
+        if tag not in self.last_published:
+            return True
+        last, last_time = self.last_published[tag]
+        elapsed = now - last_time
+        if elapsed < band['min_interval']:
+            return False
+        if band['max_interval'] is not None and elapsed >= band['max_interval']:
+            return True
+        values = value if isinstance(value, (list, tuple)) else [value]
+        lasts = last if isinstance(last, (list, tuple)) else [last]
+        n = len(values)
+        absolute = band['absolute'] if isinstance(band['absolute'], (list, tuple)) else [band['absolute']] * n
+        relative = band['relative'] if isinstance(band['relative'], (list, tuple)) else [band['relative']] * n
+        for v, l, a, r in zip(values, lasts, absolute, relative):
+            if a is None and r is None:
+                continue
+            if a is not None and abs(v - l) > a:
+                return True
+            if r is not None and abs(v - l) > r * abs(l):
+                return True
+        return False
+
+    def publish(self, tag, value):
+        """ Queues a value for a tag without waiting for the PLC. Only the newest value
+        of each tag is kept: a value still waiting when a new one arrives is dropped.
+        Tags with a deadband skip values that did not change enough """
+        now = time.monotonic()
+        with self.publish_cond:
+            if tag in self.deadbands:
+                if not self.changed(tag, value, now):
+                    self.suppressed += 1
+                    size = 4 * len(value) if isinstance(value, (list, tuple)) else 4
+                    self.bytes_saved += WRITE_OVERHEAD + len(tag) + size
+                    return
+            if tag in self.pending:
+                self.dropped += 1
+            self.pending[tag] = (value, now)
+            if self.publisher is None:
+                self.publisher_stop = False
+                self.publisher = threading.Thread(target=self.publisher_task, daemon=True)
+                self.publisher.start()
+            self.publish_cond.notify()
+
+    def publisher_task(self):
+        """ Writes pending values one at a time, so at most one write is in flight """
+        while True:
+            with self.publish_cond:
+                self.publish_cond.wait_for(lambda: self.pending or self.publisher_stop)
+                if not self.pending:
+                    return
+                tag = next(iter(self.pending))
+                value, queued = self.pending.pop(tag)
+            try:
+                response = self.client.Write(tag, value)
+                ok = response.Status == 'Success'
+            except Exception as e:
+                print(f'❌ Failed to publish {tag}: {e}')
+                ok = False
+            with self.publish_cond:
+                if ok:
+                    self.published += 1
+                    self.publish_latency.append(time.monotonic() - queued)
+                    if tag in self.deadbands:
+                        # Only a value the PLC has is a reference, a failed one is sent again
+                        self.last_published[tag] = (value, queued)
+                else:
+                    self.failed += 1
+
+    def stop_publisher(self, timeout=1.0):
+        """ Writes what is pending (up to timeout) and stops the publisher thread """
+        with self.publish_cond:
+            publisher = self.publisher
+            self.publisher_stop = True
+            self.publish_cond.notify()
+        if publisher is not None:
+            publisher.join(timeout)
+        self.publisher = None
+
+    def publish_stats(self):
+        """ Publisher counters and latency percentiles in ms """
+        with self.publish_cond:
+            latency = sorted(self.publish_latency)
+            stats = {'published': self.published, 'dropped': self.dropped,
+                     'failed': self.failed, 'pending': len(self.pending),
+                     'suppressed': self.suppressed, 'bytes_saved': self.bytes_saved}
+        if latency:
+            stats['latency_ms'] = {'p50': 1000 * latency[len(latency) // 2],
+                                   'p99': 1000 * latency[int(len(latency) * 0.99)],
+                                   'max': 1000 * latency[-1]}
+        return stats
+
     def wait_for_plc(self):
         print('Waiting for PLC')
         tag = self.config.get('TAG_INIT')
@@ -88,4 +282,14 @@ class PLCInterface:
     def disconnect(self):
         """ Closes the connection to the PLC """
         self.client.Close()
-        print("🔌 PLC connection closed.")
\ No newline at end of file
+        print("🔌 PLC connection closed.")
+
+
+def load_plc_config(config_module):
+    """ PLC_CONFIG dictionary of a plc_config file, each file is only executed once """
+    if config_module not in _configs:
+        spec = importlib.util.spec_from_file_location("plc_config", config_module)
+        config = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(config)
+        _configs[config_module] = config.PLC_CONFIG  # Assumes PLC_CONFIG is a dictionary
+    return _configs[config_module]
@@ -0,0 +1,190 @@
+"""
+In-process stand-in for pylogix.PLC, to exercise PLCInterface and VibrationMonitor
+without the controller. It holds the tags of a plc_config file in memory and can
+add per-request latency and jitter, fail requests, stall, and play a scripted
+sequence of VDF states.
+
+    client = StandInPLC(load_plc_config('plc_config_A.py'), read_latency=0.002,
+                        jitter=0.001, failure_rate=0.01, vdf_script=[(0, 0), (1, 2), (60, 0)])
+    monitor = VibrationMonitor('plc_config_A.py', plc_client=client)
+
+Run as a script for an offline end-to-end test with the simulated sensor:
+
+    python plc_standin.py <plc_config_file>.py [seconds] [latency ms] [failure rate]
+"""
+
+import random
+import sys
+import tempfile
+import threading
+import time
+
+FAILURE = 'Connection failure'          # Status of a failed request, as pylogix reports it
+
+
+class Response:
+    def __init__(self, tag, value, status='Success'):
+        self.TagName = tag
+        self.Value = value
+        self.Status = status
+
+
+class StandInPLC:
+    """In-memory pylogix.PLC replacement for the tags of one plc_config.
+
+    Requests are counted the way pylogix 1.1 sends them: a tag it has not seen yet
+    first costs a request for its data type, and a list read is one request for the
+    single elements plus one per item with an element count above 1. Requests are
+    served one at a time, like on one CIP connection, and each takes
+    read_latency or write_latency plus up to `jitter` seconds. A request fails with
+    probability `failure_rate`, and every request waits while a stall is active.
+    vdf_script is a list of (seconds since start, VDF_STATUS value); TAG_INIT turns
+    true `init_delay` seconds after start.
+    """
+
+    def __init__(self, config, frequency=60.0, test_id='BENCH', read_latency=0.0, write_latency=0.0,
+                 jitter=0.0, failure_rate=0.0, vdf_script=None, init_delay=0.0, seed=None):
+        self.IPAddress = None
+        self.config = config
+        self.read_latency = read_latency
+        self.write_latency = write_latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.vdf_script = sorted(vdf_script) if vdf_script else [(0, 2)]
+        self.init_delay = init_delay
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.tags = {config['TAG_FREQUENCY']: frequency,
+                     config['TAG_ID_PRUEBA']: test_id,
+                     config['TAG_INIT']: False,
+                     config['VDF_STATUS']: self.vdf_script[0][1],
+                     config['TAG_X']: [0.0, 0.0, 0.0, 0.0],
+                     config['TAG_HEARTBEAT']: 0}
+        self.rms_tag = config['TAG_X']
+        self.rms_writes = []                    # (monotonic time, value)
+        self.writes = {}                        # Writes per tag
+        self.known = set()                      # Tags whose data type pylogix has read
+        self.requests = 0
+        self.failures = 0
+        self.stalled_until = 0.0
+        self.start()
+
+    def start(self):
+        """Restart the VDF script and the init delay"""
+        self.t0 = time.monotonic()
+
+    def stall(self, seconds):
+        """Hold every request for the next `seconds`, like an unreachable PLC"""
+        self.stalled_until = time.monotonic() + seconds
+
+    def request(self, latency):
+        """Serve one request: wait for the connection, stall and latency. False if it fails"""
+        with self.lock:
+            self.requests += 1
+            delay = max(self.stalled_until - time.monotonic(), 0) + latency
+            if self.jitter:
+                delay += self.random.uniform(0, self.jitter)
+            if delay:
+                time.sleep(delay)
+            if self.failure_rate and self.random.random() < self.failure_rate:
+                self.failures += 1
+                return False
+            self.update_script()
+            return True
+
+    def update_script(self):
+        elapsed = time.monotonic() - self.t0
+        for at, state in self.vdf_script:
+            if at <= elapsed:
+                self.tags[self.config['VDF_STATUS']] = state
+        if elapsed >= self.init_delay:
+            self.tags[self.config['TAG_INIT']] = True
+
+    def read_types(self, tags):
+        """One request per tag of unknown data type, returns the tags it failed for"""
+        failed = set()
+        for tag in dict.fromkeys(tag.split('[')[0] for tag in tags):
+            if tag not in self.known:
+                if self.request(self.read_latency):
+                    self.known.add(tag)
+                else:
+                    failed.add(tag)
+        return failed
+
+    def Read(self, tag, count=1):
+        if isinstance(tag, list):
+            items = [t if isinstance(t, tuple) else (t, 1) for t in tag]
+            failed = self.read_types(name for name, _ in items)
+            single = [i for i, (_, n) in enumerate(items) if n == 1]
+            # Multi-service request: one round trip for all single elements
+            ok = bool(single) and self.request(self.read_latency)
+            responses = []
+            for i, (name, n) in enumerate(items):
+                if n > 1:
+                    responses.append(self.Read(name, n))    # Sent as a request of its own
+                elif ok and name.split('[')[0] not in failed:
+                    responses.append(self.read_one(name))
+                else:
+                    responses.append(Response(name, None, FAILURE))
+            return responses
+        if self.read_types([tag]) or not self.request(self.read_latency):
+            return Response(tag, None, FAILURE)
+        return self.read_one(tag, count)
+
+    def read_one(self, tag, count=1):
+        if tag.endswith('.LEN'):
+            return Response(tag, len(self.tags[tag[:-4]]))
+        if tag.endswith('.DATA[0]'):
+            return Response(tag, [ord(c) for c in self.tags[tag[:-8]][:count]])
+        if tag not in self.tags:
+            return Response(tag, None, 'Path destination unknown')
+        return Response(tag, self.tags[tag])
+
+    def Write(self, tag, value):
+        if self.read_types([tag]) or not self.request(self.write_latency):
+            return Response(tag, None, FAILURE)
+        if tag == self.rms_tag:
+            self.rms_writes.append((time.monotonic(), value))
+        self.writes[tag] = self.writes.get(tag, 0) + 1
+        self.tags[tag] = value
+        return Response(tag, value)
+
+    def Close(self):
+        pass
+
+    def stats(self):
+        return {'requests': self.requests, 'failures': self.failures, 'writes': dict(self.writes)}
+
+
+# --- Main Execution ---
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python plc_standin.py <plc_config_file>.py [seconds] [latency ms] [failure rate]")
+        sys.exit(1)
+    sys.path.append("../")
+    from ADXL357 import ADXL357, ADXL357_simulator
+    from plc_interface import load_plc_config
+    from vibration_monitor import VibrationMonitor
+    from config import CONFIG
+
+    plc_config_file = sys.argv[1]
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+    latency = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 0.002
+    failure_rate = float(sys.argv[4]) if len(sys.argv) > 4 else 0.0
+
+    # VDF stopped, running after 1 s, stopped again after the test time
+    client = StandInPLC(load_plc_config(plc_config_file), read_latency=latency, write_latency=latency,
+                        jitter=latency / 2, failure_rate=failure_rate, vdf_script=[(0, 0), (1, 2), (1 + seconds, 0)])
+    sensor = ADXL357.ADXL357(backend=ADXL357_simulator.ADXL357Simulator(), sampling_rate=CONFIG["SAMPLING_RATE"],
+                             fifo_watermark=CONFIG["FIFO_WATERMARK"])
+    monitor = VibrationMonitor(plc_config_file, sensor=sensor, plc_client=client)
+    monitor.folder_name = tempfile.mkdtemp(prefix='standin_')
+    client.start()
+    start = time.monotonic()
+    monitor.run()
+    elapsed = time.monotonic() - start
+
+    print(f"\n{elapsed:.1f} s, {monitor.sample_count} samples, {client.requests / elapsed:.1f} PLC requests/s")
+    print(f"PLC: {client.stats()}")
+    print(f"Publisher: {monitor.plc.publish_stats()}")
+    print(f"Recording in {monitor.folder_name}")
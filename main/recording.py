@@ -0,0 +1,441 @@
+"""
+Binary recording format for vibration tests.
+
+    header:  MAGIC, format version, metadata length, metadata (UTF-8 JSON)
+    blocks:  BLOCK_MAGIC, index of the first sample, samples, time of the first sample,
+             sample rate, scale, payload length, followed by the payload
+    index:   INDEX_MAGIC, entries, one INDEX_DTYPE entry per block (written on close)
+    footer:  offset of the index, MAGIC
+
+Metadata holds the sensor configuration (range, ODR, high-pass corner), the VDF
+frequency, the test ID, the start time, the channel names, dtype, units, offsets
+and encoding. Sample times are implicit: sample i of a block is at t + i / rate, so
+a block only stores the time of its first sample and the sample rate the acquisition
+clock measured for it.
+
+With encoding 'none' the payload is samples * channels values of the recording
+dtype, already in units with the offsets removed (the metadata offsets are zero).
+Any other encoding stores raw sensor counts compressed with ADXL357_codec,
+and values in units are rebuilt exactly as counts * scale - offsets.
+
+The reader memory-maps the file and finds blocks through the index, so reading a
+time range only touches the blocks it overlaps. A file without index (the writer
+did not close) is indexed by walking the block headers.
+
+    with RecordingWriter(path, encoding='zlib', odr=4000, test_id='T1') as rec:
+        rec.write_block(index, t, counts, scale)
+
+    with RecordingReader(path) as rec:
+        t, samples = rec.read_range(10.0, 11.0)
+
+Long tests are written by SegmentedRecorder as a series of such files plus an
+append-only manifest, and read back with SegmentedReader.
+"""
+
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+import zlib
+import numpy as np
+sys.path.append("../")
+
+from ADXL357 import ADXL357_codec
+
+MAGIC = b'ADXL357R'
+VERSION = 4
+HEADER = struct.Struct('<8sHI')         # Magic, version, metadata length
+BLOCK = struct.Struct('<4sQIdddI')      # Block magic, first sample index, samples, time of first sample,
+                                        # sample rate, scale, payload bytes
+BLOCK_MAGIC = b'BLK4'
+INDEX = struct.Struct('<4sQ')           # Index magic, entries
+INDEX_MAGIC = b'IDX4'
+INDEX_DTYPE = np.dtype([('index', '<u8'), ('t', '<f8'), ('rate', '<f8'), ('offset', '<u8'), ('samples', '<u4')])
+FOOTER = struct.Struct('<Q8s')          # Offset of the index, MAGIC
+CHANNELS = ('accel_x', 'accel_y', 'accel_z')
+
+
+class RecordingWriter:
+    def __init__(self, path, channels=CHANNELS, encoding='none', dtype=None, units='m/s2',
+                 offsets=None, **metadata):
+        if encoding not in ADXL357_codec.METHODS:
+            raise ValueError(f"Unknown encoding {encoding!r}, expected one of {ADXL357_codec.METHODS}")
+        self.path = path
+        self.channels = tuple(channels)
+        self.encoding = encoding
+        # Encoded recordings hold raw counts
+        self.dtype = np.dtype(dtype or ('float32' if encoding == 'none' else 'int32')).newbyteorder('<')
+        offsets = list(offsets) if offsets is not None else [0.0] * len(self.channels)
+        self.metadata = dict(metadata, channels=list(self.channels), dtype=self.dtype.str, units=units,
+                             offsets=offsets, encoding=encoding)
+        self.samples = 0                        # Samples written
+        self.first_index = None                 # Sample index and time of the first and last sample
+        self.last_index = None
+        self.t_start = None
+        self.t_end = None
+        self.index = []                         # (index, t, rate, offset, samples) per block
+        self.crc = 0                            # CRC-32 of everything written
+        self.offset = 0                         # Bytes written
+        self.file = open(path, 'xb')             # Never overwrite an existing recording
+        meta = json.dumps(self.metadata).encode()
+        self.write(HEADER.pack(MAGIC, VERSION, len(meta)) + meta)
+
+    def write(self, data):
+        self.file.write(data)
+        self.crc = zlib.crc32(data, self.crc)
+        self.offset += len(data)
+
+    def write_block(self, index, t, samples, scale=1.0, rate=None):
+        """Append an (n, channels) block whose first sample has the given index and time,
+        sampled at `rate` (default: the odr of the metadata). samples are raw counts for
+        encoded recordings, scale converts them to units."""
+        rate = float(rate or self.metadata.get('odr', 1))
+        data = np.ascontiguousarray(samples, dtype=self.dtype)
+        if data.ndim != 2 or data.shape[1] != len(self.channels):
+            raise ValueError(f"Expected an (n, {len(self.channels)}) block, got {data.shape}")
+        payload = data.data.cast('B') if self.encoding == 'none' else ADXL357_codec.encode(data, self.encoding)
+        self.index.append((index, t, rate, self.offset, len(data)))
+        self.write(BLOCK.pack(BLOCK_MAGIC, index, len(data), t, rate, scale, len(payload)))
+        self.write(payload)
+        self.samples += len(data)
+        if self.first_index is None:
+            self.first_index, self.t_start = index, t
+        self.last_index = index + len(data) - 1
+        self.t_end = t + (len(data) - 1) / rate
+
+    def flush(self):
+        self.file.flush()
+
+    def sync(self):
+        """Flush and fsync: everything written so far survives a power loss"""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self, sync=False):
+        """Write the block index and close the file, with sync=True after an fsync"""
+        if self.file.closed:
+            return
+        index = np.array(self.index, dtype=INDEX_DTYPE)
+        offset = self.offset
+        self.write(INDEX.pack(INDEX_MAGIC, len(index)))
+        self.write(index.tobytes())
+        self.write(FOOTER.pack(offset, MAGIC))
+        if sync:
+            self.sync()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SegmentedRecorder:
+    """Recording split into segment files of at most `segment_seconds` or `segment_bytes`.
+
+    Each closed segment is appended to `{name}.manifest` in the folder, one JSON line
+    with its file name, sample and time range, size and CRC-32. A recorder opened on an
+    existing recording continues after the last segment file, and adds the segments a
+    crash left out of the manifest first. Durability: segments
+    are fsynced every `fsync_interval` seconds and/or every `fsync_blocks` blocks, and
+    on close together with the manifest. With both at 0 the blocks are only flushed
+    and the OS decides when they reach the card.
+    """
+
+    def __init__(self, folder, name, segment_seconds=600, segment_bytes=256000000,
+                 fsync_interval=5.0, fsync_blocks=0, **writer_args):
+        self.folder = folder
+        self.name = name
+        self.segment_seconds = segment_seconds
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval
+        self.fsync_blocks = fsync_blocks
+        self.writer_args = writer_args
+        self.manifest_path = os.path.join(folder, f"{name}.manifest")
+        self.sequence = 0                       # Number of the next segment file
+        self.segment = None
+        self.encoding = writer_args.get('encoding', 'none')
+        self.blocks_since_sync = 0
+        self.last_sync = time.monotonic()
+        self.fsyncs = 0                         # fsync calls and the time spent in them
+        self.fsync_time = 0.0
+        self.recover()
+
+    def recover(self):
+        """Continue an existing recording: number new segments after the files on disk and add
+        the ones missing from the manifest (the recorder did not close) to it"""
+        pattern = re.compile(re.escape(self.name) + r'_(\d{4,})\.adxl$')
+        segments = sorted((int(m.group(1)), m.group(0)) for m in map(pattern.match, os.listdir(self.folder)) if m)
+        if not segments:
+            return
+        self.sequence = segments[-1][0] + 1
+        self.repair_manifest()
+        listed = {entry['segment'] for entry in read_manifest(self.manifest_path)}
+        for _, segment in segments:
+            if segment in listed:
+                continue
+            path = os.path.join(self.folder, segment)
+            try:
+                with RecordingReader(path) as reader:
+                    index = np.array(reader.index)
+            except (ValueError, struct.error):
+                print(f"⚠️ {segment} has no readable header, left out of the manifest")
+                continue
+            if len(index) == 0:
+                continue
+            n = int(index['samples'][-1])
+            self.append_manifest({'segment': segment,
+                                  'first_index': int(index['index'][0]),
+                                  'last_index': int(index['index'][-1]) + n - 1,
+                                  't_start': float(index['t'][0]),
+                                  't_end': float(index['t'][-1] + (n - 1) / index['rate'][-1]),
+                                  'samples': int(index['samples'].sum()),
+                                  'bytes': os.path.getsize(path), 'crc32': f"{file_crc32(path):08x}"})
+            print(f"🩹 Recovered {segment} into {os.path.basename(self.manifest_path)}")
+
+    def repair_manifest(self):
+        """Cut a last line a crash left unfinished, its segment is then added back from the file"""
+        if not os.path.exists(self.manifest_path):
+            return
+        with open(self.manifest_path, 'rb+') as manifest:
+            data = manifest.read()
+            complete = data.rfind(b'\n') + 1
+            if complete == len(data):
+                return
+            try:
+                json.loads(data[complete:])
+                manifest.write(b'\n')           # Only the newline is missing
+            except ValueError:
+                manifest.truncate(complete)
+                print(f"🩹 Cut an unfinished line from {os.path.basename(self.manifest_path)}")
+
+    @property
+    def durable(self):
+        return bool(self.fsync_interval or self.fsync_blocks)
+
+    def write_block(self, index, t, samples, scale=1.0, rate=None):
+        if self.segment is not None and (self.segment.offset >= self.segment_bytes
+                                         or t - self.segment.t_start >= self.segment_seconds):
+            self.close_segment()
+        if self.segment is None:
+            path = os.path.join(self.folder, f"{self.name}_{self.sequence:04d}.adxl")
+            self.segment = RecordingWriter(path, segment=self.sequence, **self.writer_args)
+            self.sequence += 1
+        self.segment.write_block(index, t, samples, scale, rate)
+        self.blocks_since_sync += 1
+
+        if ((self.fsync_blocks and self.blocks_since_sync >= self.fsync_blocks)
+                or (self.fsync_interval and time.monotonic() - self.last_sync >= self.fsync_interval)):
+            self.sync()
+        else:
+            self.segment.flush()
+
+    def sync(self):
+        start = time.perf_counter()
+        self.segment.sync()
+        self.fsync_time += time.perf_counter() - start
+        self.fsyncs += 1
+        self.blocks_since_sync = 0
+        self.last_sync = time.monotonic()
+
+    def close_segment(self):
+        """Close the current segment (index and footer) and add it to the manifest"""
+        segment = self.segment
+        self.segment = None
+        segment.close(sync=self.durable)
+        entry = {'segment': os.path.basename(segment.path),
+                 'first_index': segment.first_index, 'last_index': segment.last_index,
+                 't_start': segment.t_start, 't_end': segment.t_end,
+                 'samples': segment.samples, 'bytes': segment.offset, 'crc32': f"{segment.crc:08x}"}
+        self.append_manifest(entry)
+
+    def append_manifest(self, entry):
+        with open(self.manifest_path, 'a') as manifest:
+            manifest.write(json.dumps(entry) + '\n')
+            if self.durable:
+                manifest.flush()
+                os.fsync(manifest.fileno())
+
+    def close(self):
+        if self.segment is not None:
+            self.close_segment()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def file_crc32(path):
+    crc = 0
+    with open(path, 'rb') as f:
+        for data in iter(lambda: f.read(1 << 20), b''):
+            crc = zlib.crc32(data, crc)
+    return crc
+
+
+def read_manifest(path):
+    """Manifest entries of a segmented recording, [] if there is none yet. Lines that are not
+    valid JSON (cut short by a crash) are left out"""
+    if not os.path.exists(path):
+        return []
+    entries = []
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+    return entries
+
+
+class RecordingReader:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, length = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an ADXL357 recording")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported recording version {version}")
+        self.metadata = json.loads(self.map[HEADER.size:HEADER.size + length])
+        self.data_offset = HEADER.size + length
+        self.channels = tuple(self.metadata['channels'])
+        self.dtype = np.dtype(self.metadata['dtype'])
+        self.encoding = self.metadata['encoding']
+        self.offsets = np.array(self.metadata['offsets'])
+        self.odr = self.metadata.get('odr')
+        self.index = self.load_index()
+
+    def load_index(self):
+        """Block index from the footer, or from the block headers if the file was not closed"""
+        size = len(self.map)
+        if size >= self.data_offset + FOOTER.size:
+            offset, magic = FOOTER.unpack_from(self.map, size - FOOTER.size)
+            if magic == MAGIC and self.data_offset <= offset <= size - INDEX.size - FOOTER.size:
+                index_magic, entries = INDEX.unpack_from(self.map, offset)
+                if index_magic == INDEX_MAGIC:
+                    return np.frombuffer(self.map, dtype=INDEX_DTYPE, count=entries, offset=offset + INDEX.size)
+        entries = []
+        offset = self.data_offset
+        while offset + BLOCK.size <= size:
+            magic, index, n, t, rate, scale, length = BLOCK.unpack_from(self.map, offset)
+            if magic != BLOCK_MAGIC or offset + BLOCK.size + length > size:
+                break                           # Index, or a block cut short by a crash
+            entries.append((index, t, rate, offset, n))
+            offset += BLOCK.size + length
+        return np.array(entries, dtype=INDEX_DTYPE)
+
+    def block(self, i, raw=False):
+        """Block i as (first sample index, time of first sample, (n, channels) array).
+        Without encoding the array is a view of the mapped file. The sample
+        rate of the block is index['rate'][i]."""
+        offset = int(self.index['offset'][i])
+        magic, index, n, t, rate, scale, length = BLOCK.unpack_from(self.map, offset)
+        start = offset + BLOCK.size
+        if self.encoding == 'none':
+            data = np.frombuffer(self.map, dtype=self.dtype, count=n * len(self.channels),
+                                 offset=start).reshape(n, len(self.channels))
+        else:
+            data = ADXL357_codec.decode(self.map[start:start + length])
+        if not raw and self.encoding != 'none':
+            data = data * scale - self.offsets
+        return index, t, data
+
+    def blocks(self, raw=False):
+        """Iterate over (first sample index, time of first sample, (n, channels) array) per block.
+        raw=True gives the stored values (counts for encoded recordings) instead of units."""
+        for i in range(len(self.index)):
+            yield self.block(i, raw)
+
+    def views(self, t0, t1, raw=False):
+        """Iterate over (times, (n, channels) array) for the samples in [t0, t1), one item per
+        block overlapping the range. Only those blocks are read."""
+        starts = self.index['t']
+        first = max(np.searchsorted(starts, t0, side='right') - 1, 0)
+        last = np.searchsorted(starts, t1, side='left')
+        for i in range(first, last):
+            index, t, data = self.block(i, raw)
+            rate = self.index['rate'][i]
+            a = max(int(np.ceil((t0 - t) * rate - 1e-9)), 0)
+            b = min(max(int(np.ceil((t1 - t) * rate - 1e-9)), 0), len(data))
+            if a < b:
+                yield t + np.arange(a, b) / rate, data[a:b]
+
+    def read_range(self, t0, t1, raw=False):
+        """Samples in [t0, t1) as (times, (n, channels) array)"""
+        return self.join(self.views(t0, t1, raw))
+
+    def read(self, raw=False):
+        """Whole recording as (times, (n, channels) array)"""
+        return self.join((t + np.arange(len(data)) / rate, data)
+                         for (index, t, data), rate in zip(self.blocks(raw), self.index['rate']))
+
+    def join(self, parts):
+        times, chunks = [], []
+        for t, data in parts:
+            times.append(t)
+            chunks.append(data)
+        if not chunks:
+            return np.empty(0), np.empty((0, len(self.channels)), dtype=self.dtype)
+        if len(chunks) == 1:
+            return times[0], chunks[0]
+        return np.concatenate(times), np.concatenate(chunks)
+
+    def close(self):
+        self.index = None                       # Views into the map must go before it closes
+        try:
+            self.map.close()
+        except BufferError:
+            pass                                # The caller still holds views, the map closes with them
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SegmentedReader:
+    """Reads a segmented recording through its manifest, opening only the segments a range needs"""
+
+    def __init__(self, manifest_path):
+        self.folder = os.path.dirname(manifest_path)
+        self.entries = read_manifest(manifest_path)
+        self.readers = {}
+
+    def reader(self, entry):
+        if entry['segment'] not in self.readers:
+            self.readers[entry['segment']] = RecordingReader(os.path.join(self.folder, entry['segment']))
+        return self.readers[entry['segment']]
+
+    def verify(self):
+        """Segments whose size or CRC-32 differ from the manifest"""
+        bad = []
+        for entry in self.entries:
+            path = os.path.join(self.folder, entry['segment'])
+            if os.path.getsize(path) != entry['bytes'] or f"{file_crc32(path):08x}" != entry['crc32']:
+                bad.append(entry['segment'])
+        return bad
+
+    def read_range(self, t0, t1, raw=False):
+        """Samples in [t0, t1) as (times, (n, channels) array)"""
+        parts = [self.reader(e).read_range(t0, t1, raw) for e in self.entries
+                 if e['t_end'] >= t0 and e['t_start'] < t1]
+        if not parts:
+            return np.empty(0), np.empty((0, 0))
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+    def close(self):
+        for reader in self.readers.values():
+            reader.close()
+        self.readers = {}
@@ -0,0 +1,153 @@
+import threading
+import numpy as np
+
+
+class RingBuffer:
+    """Single-producer, multi-consumer ring buffer of fixed-width rows.
+
+    Every consumer has its own read cursor and sees every row. The producer never
+    blocks: a consumer that falls more than `capacity` rows behind skips the oldest
+    rows and counts them as overruns. Rows are stored twice (at i and i + capacity),
+    so any run of up to `capacity` rows is one contiguous slice and reads return
+    NumPy views without copying. A view stays valid until the producer has written
+    `capacity` more rows.
+
+    Rows carry no timestamps. Each block put with a start time and a sample rate adds
+    a stamp (index of its first row, time, rate), and time_of() turns row indices into
+    times from the stamp of the block they belong to. Stamps are kept for the last
+    `max_blocks` blocks (default: capacity, enough for blocks of one row).
+    """
+
+    def __init__(self, capacity, channels, dtype=np.float64, max_blocks=None):
+        self.capacity = capacity
+        self.channels = channels
+        self.data = np.zeros((2 * capacity, channels), dtype=dtype)
+        self.head = 0                           # Rows written since start
+        # Block stamps, stored twice like the rows so the latest ones are one sorted slice
+        self.max_blocks = max_blocks or capacity
+        self.stamp_index = np.zeros(2 * self.max_blocks, dtype=np.int64)
+        self.stamp_t = np.zeros(2 * self.max_blocks)
+        self.stamp_rate = np.ones(2 * self.max_blocks)
+        self.stamps = 0                         # Stamps written since start
+        self.cond = threading.Condition()
+        self.consumers = []
+
+    def add_consumer(self, name):
+        consumer = RingConsumer(self, name)
+        self.consumers.append(consumer)
+        return consumer
+
+    def put(self, row):
+        i = self.head % self.capacity
+        self.data[i] = row
+        self.data[i + self.capacity] = row
+        with self.cond:
+            self.head += 1
+            self.cond.notify_all()
+
+    def put_block(self, rows, t=None, rate=None):
+        """Add rows; with t and rate, row k of the block is at t + k / rate"""
+        n = len(rows)
+        if n > self.capacity:
+            rows = rows[-self.capacity:]
+            if t is not None:
+                t += (n - self.capacity) / rate
+            with self.cond:
+                self.head += n - self.capacity
+            n = self.capacity
+        if t is not None:
+            j = self.stamps % self.max_blocks
+            for k in (j, j + self.max_blocks):
+                self.stamp_index[k], self.stamp_t[k], self.stamp_rate[k] = self.head, t, rate
+        i = self.head % self.capacity
+        first = min(n, self.capacity - i)
+        # Primary copy [i, i + n) may wrap, mirror copy [i + capacity, ...) never does
+        self.data[i:i + first] = rows[:first]
+        self.data[:n - first] = rows[first:]
+        self.data[i + self.capacity:i + self.capacity + first] = rows[:first]
+        self.data[self.capacity:self.capacity + n - first] = rows[first:]
+        with self.cond:
+            self.head += n
+            if t is not None:
+                self.stamps += 1
+            self.cond.notify_all()
+
+    def time_of(self, index):
+        """Time of a row index (or array of indices), from the stamp of its block"""
+        k, rate = self.stamp_of(index)
+        return self.stamp_t[k] + (np.asarray(index) - self.stamp_index[k]) / rate
+
+    def rate_of(self, index):
+        """Sample rate of the block a row index belongs to"""
+        return self.stamp_of(index)[1]
+
+    def breaks(self, index, n, tolerance=0.5):
+        """Offsets in rows [index, index + n) where the rows leave the time line of the run
+        before: a block with another rate, or starting more than `tolerance` samples off
+        (samples were lost, or the clock was re-anchored)"""
+        with self.cond:
+            stamps = self.stamps
+        m = min(stamps, self.max_blocks)
+        j = (stamps - m) % self.max_blocks
+        starts = self.stamp_index[j:j + m]
+        first = j + max(np.searchsorted(starts, index, side='right') - 1, 0)
+        last = j + np.searchsorted(starts, index + n, side='left')
+        # Time line of the current run: its first stamp and rate
+        start, t, rate = self.stamp_index[first], self.stamp_t[first], self.stamp_rate[first]
+        offsets = []
+        for k in range(first + 1, last):
+            expected = t + (self.stamp_index[k] - start) / rate
+            if self.stamp_rate[k] != rate or abs(self.stamp_t[k] - expected) * rate > tolerance:
+                offsets.append(int(self.stamp_index[k] - index))
+                start, t, rate = self.stamp_index[k], self.stamp_t[k], self.stamp_rate[k]
+        return offsets
+
+    def runs(self, index, rows):
+        """Split rows read from `index` at breaks(): [(index, rows)] of runs that each follow
+        the time and rate of their first row"""
+        bounds = [0] + self.breaks(index, len(rows)) + [len(rows)]
+        return [(index + a, rows[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+
+    def stamp_of(self, index):
+        with self.cond:
+            stamps = self.stamps
+        if stamps == 0:
+            raise ValueError("No block with a time stamp was put in the ring")
+        m = min(stamps, self.max_blocks)
+        j = (stamps - m) % self.max_blocks
+        k = j + np.maximum(np.searchsorted(self.stamp_index[j:j + m], index, side='right') - 1, 0)
+        return k, self.stamp_rate[k]
+
+    def stats(self):
+        """Lag and overruns per consumer"""
+        return {c.name: {'lag': c.lag, 'overruns': c.overruns} for c in self.consumers}
+
+
+class RingConsumer:
+    def __init__(self, ring, name):
+        self.ring = ring
+        self.name = name
+        self.cursor = ring.head                 # Next row to read
+        self.overruns = 0                       # Rows skipped because the producer lapped us
+
+    @property
+    def lag(self):
+        return self.ring.head - self.cursor
+
+    def read(self, n, timeout=None):
+        """Wait for n rows, returns (index of the first row, (n, channels) view) or None on timeout"""
+        ring = self.ring
+        if n > ring.capacity:
+            raise ValueError(f"Cannot read {n} rows from a ring of {ring.capacity}")
+        with ring.cond:
+            if not ring.cond.wait_for(lambda: ring.head - self.cursor >= n, timeout):
+                return None
+            head = ring.head
+        if head - self.cursor > ring.capacity:
+            skipped = head - ring.capacity - self.cursor
+            self.overruns += skipped
+            self.cursor += skipped
+        start = self.cursor
+        self.cursor += n
+        i = start % ring.capacity
+        return start, ring.data[i:i + n]
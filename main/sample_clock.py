@@ -0,0 +1,71 @@
+import time
+
+
+class SampleClock:
+    """Timestamps derived from the sample index and the ODR instead of a clock read per sample.
+
+    Time is piecewise linear in the sample index. Every `reanchor_interval` seconds of
+    samples the model is compared against time.monotonic_ns(): the rate estimate follows
+    the measured rate (drift of the sensor oscillator against the host clock) and the
+    phase is nudged towards the measurement by at most half a sample, so timestamps stay
+    strictly increasing and never follow NTP steps of the wall clock.
+    """
+
+    def __init__(self, rate, reanchor_interval=1.0, rate_gain=0.1, phase_gain=0.1):
+        self.nominal_rate = float(rate)
+        self.rate = float(rate)                 # Estimated samples per second
+        self.reanchor_interval = reanchor_interval
+        self.rate_gain = rate_gain
+        self.phase_gain = phase_gain
+        self.t0_ns = None                       # monotonic_ns() of sample 0
+        self.wall_start = None                  # time.time() of sample 0, for file metadata
+        self.count = 0                          # Samples accounted for
+        self.next_anchor = 0
+
+    def start(self):
+        self.t0_ns = time.monotonic_ns()
+        self.wall_start = time.time()
+        self.count = 0
+        self.rate = self.nominal_rate
+        self.anchor_index = 0                   # Sample index of the current anchor
+        self.anchor_time = 0.0                  # Model time of the anchor, seconds since t0
+        self.measured_index = 0                 # Last re-anchor measurement
+        self.measured_time = 0.0
+        self.next_anchor = int(self.reanchor_interval * self.rate)
+
+    def time_of(self, index):
+        """Seconds since sample 0 for a sample index"""
+        return self.anchor_time + (index - self.anchor_index) / self.rate
+
+    def advance(self, n=1):
+        """Account for n new samples (including skipped ones), returns the index of the first"""
+        index = self.count
+        self.count += n
+        if self.count >= self.next_anchor:
+            self.reanchor()
+        return index
+
+    def reanchor(self):
+        now = (time.monotonic_ns() - self.t0_ns) / 1e9
+        index = self.count - 1                  # Newest sample, acquired just before now
+        predicted = self.time_of(index)         # With the rate in use up to now
+        if now > self.measured_time and index > self.measured_index:
+            observed = (index - self.measured_index) / (now - self.measured_time)
+            self.rate += self.rate_gain * (observed - self.rate)
+        self.measured_index, self.measured_time = index, now
+
+        step = self.phase_gain * (now - predicted)
+        half = 0.5 / self.rate
+        step = max(-half, min(half, step))
+        self.anchor_time, self.anchor_index = predicted + step, index
+        self.next_anchor = self.count + int(self.reanchor_interval * self.rate)
+
+    def expected_count(self):
+        """Samples the sensor should have produced by now according to the rate estimate"""
+        now = (time.monotonic_ns() - self.t0_ns) / 1e9
+        return int((now - self.anchor_time) * self.rate) + self.anchor_index + 1
+
+    @property
+    def drift_ppm(self):
+        """Estimated sensor rate error against the nominal ODR in ppm"""
+        return (self.rate / self.nominal_rate - 1) * 1e6
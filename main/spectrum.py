@@ -0,0 +1,91 @@
+import numpy as np
+
+
+class StreamingWelch:
+    """Welch power spectral density per axis, updated every `interval` seconds.
+
+    Samples are collected until whole segments of `nperseg` samples (Hann window,
+    `overlap` fraction shared with the next one) are available; those segments go
+    through one batched FFT. Every `interval` seconds of samples the averaged one-sided
+    PSD of the segments since the last update is turned into band powers and the
+    `n_peaks` largest spectral peaks per axis.
+    """
+
+    def __init__(self, rate, nperseg=1024, overlap=0.5, interval=1.0, bands=(), n_peaks=3, channels=3):
+        self.rate = rate
+        self.nperseg = nperseg
+        self.step = max(int(nperseg * (1 - overlap)), 1)
+        self.interval = int(round(interval * rate))     # Samples between updates
+        self.n_peaks = n_peaks
+        self.channels = channels
+        self.window = np.hanning(nperseg)
+        self.freqs = np.fft.rfftfreq(nperseg, 1 / rate)
+        # One-sided density scaling, DC and Nyquist are not doubled
+        self.scale = np.full(len(self.freqs), 2 / (rate * np.sum(self.window ** 2)))
+        self.scale[0] /= 2
+        if nperseg % 2 == 0:
+            self.scale[-1] /= 2
+        self.df = rate / nperseg
+        self.bands = [tuple(b) for b in bands]
+        self.band_masks = [(self.freqs >= lo) & (self.freqs < hi) for lo, hi in self.bands]
+
+        self.pending = np.zeros((0, channels))          # Samples not yet in a segment
+        self.sum = np.zeros((len(self.freqs), channels))
+        self.segments = 0                               # Segments in sum
+        self.count = 0                                  # Samples seen
+        self.next_update = self.interval
+
+    def update(self, block):
+        """Add an (n, channels) block, returns a list of (sample count, result) updates,
+        see result() for the contents"""
+        self.pending = np.concatenate((self.pending, np.asarray(block, dtype=np.float64)))
+        self.count += len(block)
+        results = []
+        # Segments ending before the next update belong to it
+        while True:
+            limit = len(self.pending) - max(self.count - self.next_update, 0)
+            n = (limit - self.nperseg) // self.step + 1 if limit >= self.nperseg else 0
+            if n > 0:
+                self.add_segments(n)
+            if self.count < self.next_update:
+                break
+            results.append((self.next_update, self.result()))
+            self.next_update += self.interval
+        return results
+
+    def add_segments(self, n):
+        segments = np.lib.stride_tricks.sliding_window_view(self.pending, self.nperseg, axis=0)[::self.step][:n]
+        # (n, channels, nperseg): detrend by the segment mean, window, FFT along the last axis
+        segments = segments - segments.mean(axis=2, keepdims=True)
+        spectra = np.fft.rfft(segments * self.window, axis=2)
+        self.sum += np.sum(spectra.real ** 2 + spectra.imag ** 2, axis=0).T
+        self.segments += n
+        self.pending = self.pending[n * self.step:]
+
+    def result(self):
+        """{'psd': (bins, channels) in units^2/Hz, 'bands': (bands, channels) power in units^2,
+        'peak_hz' and 'peak_psd': (n_peaks, channels)}, NaN when no segment completed"""
+        if self.segments:
+            psd = self.sum / self.segments * self.scale[:, None]
+        else:
+            psd = np.full((len(self.freqs), self.channels), np.nan)
+        self.sum = np.zeros_like(self.sum)
+        self.segments = 0
+        bands = np.array([psd[mask].sum(axis=0) * self.df for mask in self.band_masks]).reshape(-1, self.channels)
+        peak_hz, peak_psd = self.peaks(psd)
+        return {'psd': psd, 'bands': bands, 'peak_hz': peak_hz, 'peak_psd': peak_psd}
+
+    def peaks(self, psd):
+        """Largest local maxima per axis, frequency refined by a parabola through the log PSD"""
+        peak_hz = np.full((self.n_peaks, self.channels), np.nan)
+        peak_psd = np.full((self.n_peaks, self.channels), np.nan)
+        for c in range(self.channels):
+            p = psd[:, c]
+            local = np.flatnonzero((p[1:-1] > p[:-2]) & (p[1:-1] >= p[2:])) + 1
+            top = local[np.argsort(p[local])[::-1][:self.n_peaks]]
+            for i, k in enumerate(top):
+                a, b, d = np.log(p[k - 1:k + 2] + 1e-30)
+                shift = 0.5 * (a - d) / (a - 2 * b + d) if a - 2 * b + d != 0 else 0.0
+                peak_hz[i, c] = (k + shift) * self.df
+                peak_psd[i, c] = p[k]
+        return peak_hz, peak_psd
@@ -0,0 +1,68 @@
+import threading
+import time
+
+
+class StatusWatcher:
+    """Polls a PLC status tag from its own thread and calls back on every change.
+
+    The poll interval adapts: it is `fast_interval` for `fast_period` seconds after
+    start, after a change and after expect_change(), when transitions are likely,
+    and doubles from there up to `slow_interval` while the value stays the same.
+    Callbacks get (old value, new value) and run in the watcher thread.
+    """
+
+    def __init__(self, plc, tag, fast_interval=0.05, slow_interval=0.5, fast_period=2.0):
+        self.plc = plc
+        self.tag = tag
+        self.fast_interval = fast_interval
+        self.slow_interval = slow_interval
+        self.fast_period = fast_period
+        self.callbacks = []
+        self.value = None                       # Last value read
+        self.polls = 0                          # PLC reads done
+        self.fast_until = 0.0
+        self.wake = threading.Event()           # Set to poll at once
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def on_change(self, callback):
+        self.callbacks.append(callback)
+
+    def expect_change(self, seconds=None):
+        """Poll fast for a while, e.g. when a transition is about to happen"""
+        self.fast_until = time.monotonic() + (self.fast_period if seconds is None else seconds)
+        self.wake.set()
+
+    def start(self):
+        self.stop_event.clear()
+        self.fast_until = time.monotonic() + self.fast_period
+        self.thread = threading.Thread(target=self.watch, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.wake.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+
+    def poll(self):
+        value = self.plc.read_plc_tag(self.tag)
+        self.polls += 1
+        if value is None or value == self.value:
+            return
+        old, self.value = self.value, value
+        self.fast_until = time.monotonic() + self.fast_period
+        for callback in self.callbacks:
+            callback(old, value)
+
+    def watch(self):
+        interval = self.fast_interval
+        while not self.stop_event.is_set():
+            self.poll()
+            if time.monotonic() < self.fast_until:
+                interval = self.fast_interval
+            else:
+                interval = min(2 * interval, self.slow_interval)
+            self.wake.wait(interval)
+            self.wake.clear()
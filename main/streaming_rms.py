@@ -0,0 +1,68 @@
+import numpy as np
+
+
+class StreamingRMS:
+    """Sliding-window RMS over several window lengths from one running sum of squares.
+
+    Squares are accumulated into prefix sums, so the sum over any window ending at the
+    newest sample is one subtraction: the cost per output does not depend on the window
+    length. An output is produced every `hop` samples for every window; windows that are
+    not full yet give NaN. Only the last max(windows) samples are kept. The prefix sums
+    are rebased whenever the history is compacted and recomputed from the stored squares
+    every `resum_interval` samples, so rounding errors cannot build up over long runs.
+    """
+
+    def __init__(self, windows, hop, channels=3, resum_interval=1000000):
+        self.windows = np.array(sorted(set(int(w) for w in windows)))
+        self.span = int(self.windows[-1])
+        self.hop = int(hop)
+        self.channels = channels
+        self.resum_interval = resum_interval
+        self.sq = np.zeros((2 * self.span, channels))          # Squares of the kept samples
+        self.prefix = np.zeros((2 * self.span + 1, channels))  # prefix[i] = sum of sq[:i]
+        self.length = 0                                        # Kept samples
+        self.count = 0                                         # Samples seen since start
+        self.since_resum = 0
+
+    def reserve(self, n):
+        """Make room for n new samples, keeping the last `span` ones"""
+        keep = min(self.length, self.span)
+        if self.length + n > len(self.sq):
+            drop = self.length - keep
+            if keep + n > len(self.sq):
+                sq = np.zeros((keep + n + self.span, self.channels))
+                sq[:keep] = self.sq[drop:self.length]
+                self.sq = sq
+                self.prefix = np.zeros((len(sq) + 1, self.channels))
+                self.since_resum = self.resum_interval
+            else:
+                self.sq[:keep] = self.sq[drop:self.length]
+                self.prefix[:keep + 1] = self.prefix[drop:self.length + 1] - self.prefix[drop]
+            self.length = keep
+        if self.since_resum >= self.resum_interval:
+            np.cumsum(self.sq[:self.length], axis=0, out=self.prefix[1:self.length + 1])
+            self.prefix[0] = 0
+            self.since_resum = 0
+
+    def update(self, block):
+        """Add an (n, channels) block, returns (sample index of the last sample of each
+        output, (outputs, windows, channels) RMS array)"""
+        block = np.asarray(block, dtype=np.float64)
+        n = len(block)
+        self.reserve(n)
+        begin, end = self.length, self.length + n
+        np.square(block, out=self.sq[begin:end])
+        np.cumsum(self.sq[begin:end], axis=0, out=self.prefix[begin + 1:end + 1])
+        self.prefix[begin + 1:end + 1] += self.prefix[begin]
+        first = self.count
+        self.length = end
+        self.count += n
+        self.since_resum += n
+
+        counts = np.arange((first // self.hop + 1) * self.hop, self.count + 1, self.hop)
+        pos = counts - first + begin
+        starts = np.maximum(pos[:, None] - self.windows[None, :], 0)
+        sums = self.prefix[pos][:, None, :] - self.prefix[starts]
+        rms = np.sqrt(np.maximum(sums, 0) / self.windows[None, :, None])
+        rms[counts[:, None] < self.windows[None, :]] = np.nan
+        return counts - 1, rms
@@ -1,24 +1,40 @@
 import threading
 import queue
 import time
-import csv
 import numpy as np
 import os
 import sys
 sys.path.append("../")
 
 from ADXL357 import ADXL357
-from plc_interface import PLCInterface  # Import PLC class
+from plc_interface import PLCInterface, PLCConnectionManager, load_plc_config  # Import PLC class
+from sample_clock import SampleClock
+from ring_buffer import RingBuffer
+from status_watcher import StatusWatcher
+from streaming_rms import StreamingRMS
+from spectrum import StreamingWelch
+from order_tracking import OrderTracker, MAX_FRACTION
+from decimator import DecimatorBank
+from recording import SegmentedRecorder
 from config import CONFIG
 
 class VibrationMonitor:
-    def __init__(self, plc_config):
+    def __init__(self, plc_config, sensor=None, plc_client=None):
         """Initialize the vibration monitoring system."""
         self.host = CONFIG["HOST"]
         self.port = CONFIG["PORT"]
         self.sampling_rate = CONFIG["SAMPLING_RATE"]
         self.window_size = CONFIG["WINDOW_SIZE"]
+        self.rms_windows = CONFIG["RMS_WINDOWS"]
+        self.rms_hop = CONFIG["RMS_HOP"]
         self.save_interval = CONFIG["SAVE_INTERVAL"]
+        self.record_encoding = CONFIG["RECORD_ENCODING"]
+        self.segment_seconds = CONFIG["SEGMENT_SECONDS"]
+        self.segment_mb = CONFIG["SEGMENT_MB"]
+        self.fsync_interval = CONFIG["FSYNC_INTERVAL"]
+        self.fsync_blocks = CONFIG["FSYNC_BLOCKS"]
+        self.block_size = CONFIG["BLOCK_SIZE"]
+        self.fifo_watermark = CONFIG["FIFO_WATERMARK"]
         self.plc_update_interval = CONFIG["PLC_UPDATE_INTERVAL"]
         self.threshold = CONFIG["THRESHOLD"]
         self.testing = CONFIG["TESTING"]
@@ -26,110 +42,325 @@ class VibrationMonitor:
 
         self.g = 9.80665
 
-        # Init PLC Interface
-        self.plc = PLCInterface(plc_config)
-        self.status_plc = PLCInterface(plc_config)
-        self.heartbeat_plc =  PLCInterface(plc_config)
+        # Init PLC Interface: every interface uses a session of one connection manager
+        plc_settings = load_plc_config(plc_config)
+        self.plc_connections = PLCConnectionManager(plc_settings['IP_ADDRESS'], CONFIG["PLC_SESSIONS"], plc_client)
+        self.plc = PLCInterface(plc_config, self.plc_connections.session(0))
+        self.status_plc = PLCInterface(plc_config, self.plc_connections.session(1))
+        self.heartbeat_plc = PLCInterface(plc_config, self.plc_connections.session(2))
 
-        # Read PLC values
-        self.frequency = float(self.plc.read_plc_tag(self.plc.config.get("TAG_FREQUENCY", 0)))
+        # RMS goes to the PLC only on a meaningful change, or as a keep-alive
+        self.plc.set_deadband(self.plc.config.get('TAG_X', 0),
+                              absolute=[None] + [CONFIG["RMS_DEADBAND"]] * 3,
+                              relative=[None] + [CONFIG["RMS_DEADBAND_REL"]] * 3,
+                              min_interval=CONFIG["PLC_MIN_INTERVAL"], max_interval=CONFIG["PLC_MAX_INTERVAL"])
 
-        # Shared buffers
-        self.data_queue = queue.Queue(maxsize=self.save_interval * 2)  # Holds raw data
+        # Read PLC values: frequency and test ID in one request, pylogix decodes the STRING
+        tag_frequency = self.plc.config.get("TAG_FREQUENCY", 0)
+        tag_id = self.plc.config.get('TAG_ID_PRUEBA', 'NO_ID_FOUND')
+        values = self.plc.read_tags([tag_frequency, tag_id])
+        if values[0] is None:
+            values[0] = self.plc.read_plc_tag(tag_frequency)
+        self.frequency = float(values[0])
+        self.running_frequency = self.frequency  # Follows the tag while running, for order tracking
+        self.id = values[1]
+        if not isinstance(self.id, str):
+            self.id = self.plc.read_plc_string_tag_members(tag_id)  # The batched read already tried the tag
+        print(f'🔹 Test ID: {self.id}') 
+        self.file_name = f"{self.frequency}hz_{self.id}"
+
+        # Shared buffers: every consumer reads every (x, y, z) sample through its own cursor,
+        # sample times come from the start time and rate stamped on every block
+        self.data_ring = RingBuffer(self.save_interval * 4, 3)
+        # Decimated streams at ODR / factor, each consumer reads the full rate or one of them
+        self.rms_decimation = CONFIG["RMS_DECIMATION"]
+        self.spectrum_decimation = CONFIG["SPECTRUM_DECIMATION"]
+        self.orders_decimation = CONFIG["ORDERS_DECIMATION"]
+        top = max(CONFIG["ORDERS"]) * self.frequency
+        if self.orders_decimation != 1 and top >= MAX_FRACTION * self.sampling_rate / self.orders_decimation:
+            # Too close to the Nyquist frequency of the decimated stream
+            print(f"⚠️ Order {max(CONFIG['ORDERS'])} of {self.frequency} Hz does not fit ODR / "
+                  f"{self.orders_decimation}, order tracking reads the full rate")
+            self.orders_decimation = 1
+        self.decimation_factors = sorted(set(CONFIG["DECIMATION_FACTORS"]) - {1} | {
+            f for f in (self.rms_decimation, self.spectrum_decimation, self.orders_decimation) if f != 1})
+        self.decimated_rings = {f: RingBuffer(max(self.save_interval * 4 // f, 4 * self.block_size), 3)
+                                for f in self.decimation_factors}
+        if self.decimation_factors:
+            self.decimation_reader = self.data_ring.add_consumer('decimation')
+        self.decimator = None
+
+        self.rms_reader = self.stream(self.rms_decimation).add_consumer('rms')
+        self.saving_reader = self.data_ring.add_consumer('saving')
+        self.spectrum_enabled = CONFIG["SPECTRUM_ENABLED"]
+        if self.spectrum_enabled:
+            self.spectrum_reader = self.stream(self.spectrum_decimation).add_consumer('spectrum')
+        self.orders_enabled = CONFIG["ORDERS_ENABLED"]
+        if self.orders_enabled:
+            self.orders_reader = self.stream(self.orders_decimation).add_consumer('orders')
         self.rms_queue = queue.Queue(maxsize=100)  # Holds RMS values for PLC
 
+        # VDF status, polled by its own thread
+        self.status_watcher = StatusWatcher(self.status_plc, self.status_plc.config.get('VDF_STATUS', 0),
+                                            CONFIG["STATUS_FAST_INTERVAL"], CONFIG["STATUS_SLOW_INTERVAL"],
+                                            CONFIG["STATUS_FAST_PERIOD"])
+        self.status_watcher.on_change(self.check_if_running)
+        # Running frequency, re-tunes the order tracking
+        self.frequency_watcher = StatusWatcher(self.status_plc, tag_frequency, CONFIG["FREQUENCY_POLL_INTERVAL"],
+                                               CONFIG["FREQUENCY_POLL_INTERVAL"], 0)
+        self.frequency_watcher.on_change(self.frequency_changed)
+
         # Logging state
         self.is_logging = True  # Start with logging on
         self.vdf_running = False
-
-        # Read PLC string ID
-        self.id = self.plc.read_plc_string_tag(self.plc.config.get('TAG_ID_PRUEBA', 'NO_ID_FOUND'))
-        print(f'🔹 Test ID: {self.id}') 
-        self.file_name = f"{self.frequency}hz_{self.id}"
+        self.stop_event = threading.Event()  # Set to stop all tasks
+        self.sampling_thread = None  # Started by run()
+        self.consumer_threads = []
+        self.clock = SampleClock(self.sampling_rate)  # Sample timestamps from index and ODR
+        self.sample_count = 0  # Samples drained from the sensor
+        self.fifo_overruns = 0
+        self.samples_lost = 0  # Samples skipped by the time axis after overruns
 
         
         # Sensor setup
-        self.sensor = ADXL357.ADXL357()
-        self.sensor.setrange(40)
-        self.sensor.setfilter(self.sampling_rate, 0)
-
-    def check_if_running(self):
-        """Check VDF status and control logging state."""
-        tag = self.status_plc.config.get('VDF_STATUS', 0)
-        value = self.status_plc.read_plc_tag(tag)
+        if sensor is None:
+            sensor = ADXL357.ADXL357(output_range=40, sampling_rate=self.sampling_rate, hpass_corner=0,
+                                     fifo_watermark=self.fifo_watermark)
+        self.sensor = sensor
+
+    def stream(self, factor):
+        """Ring buffer of the samples decimated by `factor`, the full-rate one for 1"""
+        return self.data_ring if factor == 1 else self.decimated_rings[factor]
+
+    def check_if_running(self, old, value):
+        """VDF status change: control logging state, stop once the VDF stops after running."""
         if value == 2:
             self.vdf_running = True
             
         if self.vdf_running and value != 2:
             self.vdf_running = False
             self.is_logging = False
+            self.stop_event.set()
             
+    def frequency_changed(self, old, value):
+        self.running_frequency = float(value)
+
+    def axis_offsets(self):
+        """Sensor software offsets in m/s2, in the (x, y, z) order of the recorded columns"""
+        o = self.sensor.offsets
+        return np.array([o['y'], o['x'], o['z']]) * self.g
+
     def sampling_task(self):
-        """Continuously sample accelerometer data and add to queue."""
+        """Continuously drain the sensor FIFO and add fixed-size blocks to the ring buffer."""
         print("📡 Starting sampling task...")
-        start_time = time.time()
+        self.clock = SampleClock(self.sensor.odr)
+        # Staging block of (x, y, z) rows, reused for every block
+        block = np.empty((self.block_size, 3), dtype=np.float64)
+        fill = 0
+        start = 0  # Clock index of the first row of the block
         self.sensor.start()
+        self.sensor.read_fifo_bytes()  # Discard samples and the overrun flag from before the start
+        self.sensor.fifooverrange()
+        self.clock.start()
 
-        while True:
-            x0, y0, z0 = self.sensor.get_axis()
-            x = self.g*x0
-            y = self.g*y0
-            z = self.g*z0
-            
-            self.data_queue.put((time.time() - start_time, y, x, z)) ##CAMBIAMOS EJES X E Y DEBIDO A CONFIGURACION DEL SENSOR ANTIGUO
+        while not self.stop_event.is_set():
+            self.sensor.wait_fifo()
+            samples = self.sensor.decode(self.sensor.read_fifo_bytes(), raw=True)
+            self.sample_count += len(samples)
+            # Counts to m/s2 in float64, so the saving task can recover the exact counts
+            scale = self.sensor.factor * self.g
+            offsets = self.axis_offsets()
+            if self.sensor.fifooverrange():
+                # Samples were lost: close the block and move the time axis to where the sensor is now
+                self.fifo_overruns += 1
+                if fill:
+                    self.put_samples(block[:fill], start)
+                    fill = 0
+                lost = max(self.clock.expected_count() - self.clock.count - len(samples), 0)
+                self.clock.advance(lost)
+                self.samples_lost += lost
+
+            while len(samples):
+                n = min(len(samples), self.block_size - fill)
+                rows = block[fill:fill + n]
+                index = self.clock.advance(n)
+                if fill == 0:
+                    start = index
+                ##CAMBIAMOS EJES X E Y DEBIDO A CONFIGURACION DEL SENSOR ANTIGUO
+                np.multiply(samples[:n, 1], scale, out=rows[:, 0])
+                np.multiply(samples[:n, 0], scale, out=rows[:, 1])
+                np.multiply(samples[:n, 2], scale, out=rows[:, 2])
+                rows -= offsets
+                samples = samples[n:]
+                fill += n
+                if fill == self.block_size:
+                    self.put_samples(block, start)
+                    fill = 0
+
+        if fill:
+            self.put_samples(block[:fill], start)
+        print(f"⏱️ Sensor clock: {self.clock.rate:.3f} Hz, {self.clock.drift_ppm:+.0f} ppm against the nominal ODR")
+
+    def put_samples(self, rows, index):
+        """Add a block to the ring, stamped with the time and rate of the sample clock"""
+        self.data_ring.put_block(rows, self.clock.time_of(index), self.clock.rate)
+
+    def decimation_task(self):
+        """Anti-aliased, decimated copies of the samples for the consumers that do not need the full rate."""
+        print("⏬ Starting decimation task...")
+        self.decimator = DecimatorBank(self.sensor.odr, self.decimation_factors)
+        while not self.stop_event.is_set():
+            block = self.decimation_reader.read(self.block_size, timeout=0.1)
+            if block is None:
+                continue
+            for index, rows in self.data_ring.runs(*block):
+                t, rate = self.data_ring.time_of(index), self.data_ring.rate_of(index)
+                for factor, (samples, t_out, rate_out) in self.decimator.update(rows, t, rate).items():
+                    if len(samples):
+                        self.decimated_rings[factor].put_block(samples, t_out, rate_out)
+        cpu = ', '.join(f"1/{f}: {s:.2f} s" for f, s in self.decimator.chain_cpu().items())
+        print(f"⏬ Decimation CPU per chain: {cpu}")
 
     def rms_and_plc_task(self):
         """Compute RMS and send to PLC."""
         print("📊 Starting RMS & PLC communication task...")
 
-        while True:
-            buffer = []
+        # Window and hop lengths are full-rate samples, the RMS stream has one every rms_decimation
+        window, hop_size, *windows = (max(round(n / self.rms_decimation), 1)
+                                      for n in [self.window_size, self.rms_hop] + list(self.rms_windows))
+        rms = StreamingRMS([window] + windows, hop_size)
+        plc_window = list(rms.windows).index(window)
+        while not self.stop_event.is_set():
             # Collect data for RMS
-            while len(buffer) < self.window_size:
-                try:
-                    t, x, y, z = self.data_queue.get(timeout=0.01)
-                    buffer.append((x, y, z))
-                except queue.Empty:
-                    continue
+            hop = self.rms_reader.read(hop_size, timeout=0.1)
+            if hop is None:
+                continue
+            first = rms.count
+            indices, values = rms.update(hop[1])
+            if len(indices) == 0:
+                continue
 
-            # Calculate RMS
-            buffer_np = np.array(buffer[-self.window_size:])
-            t = float(t)
-            rms_x = float(np.sqrt(np.mean(buffer_np[:, 0] ** 2)))
-            rms_y = float(np.sqrt(np.mean(buffer_np[:, 1] ** 2)))
-            rms_z = float(np.sqrt(np.mean(buffer_np[:, 2] ** 2)))
+            # Latest output, one RMS per window and axis
+            t = float(self.stream(self.rms_decimation).time_of(hop[0] + indices[-1] - first))
+            rms_x, rms_y, rms_z = values[-1, plc_window].tolist()
             #self.rms_queue.put((rms_x, rms_y, rms_z))
 
             # Threshold check
-            if max(rms_x, rms_y, rms_z) > self.threshold:
+            if np.nanmax(values[-1], initial=0) > self.threshold:
                 print(f"⚠️ Threshold exceeded: RMS=[{rms_x:.2f}, {rms_y:.2f}, {rms_z:.2f}]")
-            # Send to PLC
-            try:
-                send_values = [t, rms_x, rms_y, rms_z]
-                print(f'Trying to write rms: {send_values}')
-                self.plc.client.Write(self.plc.config.get('TAG_X', 0), send_values)
-                
-            except Exception as e:
-                print(f'❌ Failed to send RMS values to PLC: {e}')
+            # Send to PLC, without waiting for it: a slow PLC only drops intermediate values
+            send_values = [t, rms_x, rms_y, rms_z]
+            self.plc.publish(self.plc.config.get('TAG_X', 0), send_values)
 
             time.sleep(self.plc_update_interval)
 
     def data_saving_task(self):
-        """Save data to CSV periodically."""
+        """Save data to a binary recording periodically."""
         print("💾 Starting data saving task...")
         os.makedirs(self.folder_name, exist_ok=True)
-        with open(f"{self.folder_name}/{self.file_name}.csv", "w", newline="") as file:
-            writer = csv.writer(file)
-            writer.writerow(["timestamp", "accel_x", "accel_y", "accel_z"])  # CSV header
-            while True:
-                chunk = []
-                while len(chunk) < self.save_interval:
-                    try:
-                        chunk.append(self.data_queue.get(timeout=0.1))
-                    except queue.Empty:
-                        continue
-                writer.writerows(chunk)
-                file.flush()
+        recording = None
+        while True:
+            chunk = self.saving_reader.read(self.save_interval, timeout=0.1)
+            if chunk is None:
+                if not self.stop_event.is_set():
+                    continue
+                # Save what is left before stopping
+                rest = min(self.saving_reader.lag, self.data_ring.capacity)
+                if rest == 0:
+                    break
+                chunk = self.saving_reader.read(rest)
+            scale = self.sensor.factor * self.g
+            offsets = self.axis_offsets()
+            if recording is None:
+                # Opened on the first chunk, once the sample clock has started. Without encoding
+                # the rows are stored as they are, with the offsets already removed
+                encoded = self.record_encoding != 'none'
+                recording = self._open_recorder('', encoding=self.record_encoding,
+                                                offsets=offsets.tolist() if encoded else None,
+                                                output_range=self.sensor.output_range, odr=self.sensor.odr,
+                                                hpass_corner=self.sensor.hpass_corner)
+            # One recording block per run of samples on one time line, with the clock's rate
+            for index, rows in self.data_ring.runs(*chunk):
+                t, rate = float(self.data_ring.time_of(index)), float(self.data_ring.rate_of(index))
+                if recording.encoding == 'none':
+                    recording.write_block(index, t, rows, rate=rate)
+                else:
+                    # Values are counts * scale - offsets in float64, rounding gives back the exact counts
+                    counts = np.rint((rows + offsets) / scale)
+                    recording.write_block(index, t, counts, scale, rate)
+        if recording is not None:
+            recording.close()
+
+    def _open_recorder(self, suffix, **metadata):
+        """Segmented recording `{file_name}{suffix}` in the output folder, with the segment and
+        fsync settings of the config and the test metadata"""
+        return SegmentedRecorder(self.folder_name, f"{self.file_name}{suffix}",
+                                 segment_seconds=self.segment_seconds, segment_bytes=self.segment_mb * 1000000,
+                                 fsync_interval=self.fsync_interval, fsync_blocks=self.fsync_blocks,
+                                 frequency=self.frequency, test_id=self.id, start_time=self.clock.wall_start,
+                                 **metadata)
+
+    def spectrum_task(self):
+        """Welch PSD per axis: band powers and peak frequencies to the PLC and a recording."""
+        print("🎵 Starting spectrum task...")
+        bands = CONFIG["SPECTRUM_BANDS"]
+        n_peaks = CONFIG["SPECTRUM_PEAKS"]
+        interval = CONFIG["SPECTRUM_INTERVAL"]
+        welch = StreamingWelch(self.sensor.odr / self.spectrum_decimation, CONFIG["SPECTRUM_NPERSEG"],
+                               CONFIG["SPECTRUM_OVERLAP"], interval, bands, n_peaks)
+        tag = self.plc.config.get('TAG_SPECTRUM')  # Optional: [t, bands x/y/z..., peaks x/y/z...]
+        recording = None
+        while not self.stop_event.is_set():
+            block = self.spectrum_reader.read(self.block_size, timeout=0.1)
+            if block is None:
+                continue
+            first = welch.count
+            for count, result in welch.update(block[1]):
+                t = float(self.stream(self.spectrum_decimation).time_of(block[0] + count - first - 1))
+                row = np.concatenate((result['bands'].T.ravel(), result['peak_hz'].T.ravel()))
+                if tag:
+                    self.plc.publish(tag, [t] + row.tolist())
+                if recording is None:
+                    channels = ([f"{axis}_band{i}" for axis in "xyz" for i in range(len(bands))]
+                                + [f"{axis}_peak{i}_hz" for axis in "xyz" for i in range(n_peaks)])
+                    recording = self._open_recorder('_spectrum', channels=channels,
+                                                    units='band (m/s2)^2, peak Hz', odr=1 / interval,
+                                                    bands=bands, nperseg=welch.nperseg)
+                recording.write_block(count // welch.interval - 1, t, row[None, :])
+        if recording is not None:
+            recording.close()
+
+    def order_tracking_task(self):
+        """Amplitude and phase of the running frequency orders per axis, to the PLC and a recording."""
+        print("⚙️ Starting order tracking task...")
+        orders = CONFIG["ORDERS"]
+        tracker = OrderTracker(self.sensor.odr / self.orders_decimation, self.running_frequency, orders,
+                               CONFIG["ORDERS_INTERVAL"])
+        tag = self.plc.config.get('TAG_ORDERS')  # Optional: [t, frequency, amplitudes x/y/z..., phases x/y/z...]
+        recording = None
+        outputs = 0
+        while not self.stop_event.is_set():
+            block = self.orders_reader.read(self.block_size, timeout=0.1)
+            if block is None:
+                continue
+            if self.running_frequency != tracker.next_frequency:
+                tracker.set_frequency(self.running_frequency)
+            first = tracker.count
+            for count, frequency, amplitude, phase in tracker.update(block[1]):
+                t = float(self.stream(self.orders_decimation).time_of(block[0] + count - first - 1))
+                row = np.concatenate(([frequency], amplitude.T.ravel(), phase.T.ravel()))
+                if tag:
+                    self.plc.publish(tag, [t] + row.tolist())
+                if recording is None:
+                    channels = (['frequency_hz'] + [f"{axis}_order{k}_amp" for axis in "xyz" for k in orders]
+                                + [f"{axis}_order{k}_deg" for axis in "xyz" for k in orders])
+                    recording = self._open_recorder('_orders', channels=channels,
+                                                    units='Hz, amplitude m/s2 peak, phase deg',
+                                                    odr=1 / tracker.interval, orders=orders)
+                recording.write_block(outputs, t, row[None, :])
+                outputs += 1
+        if recording is not None:
+            recording.close()
 
     def heartbeat_task(self):
         print('Starting heartbeat')
@@ -141,9 +372,9 @@ class VibrationMonitor:
             ms = 500
             s = ms/1000
             value = True
-            while True:
+            while not self.stop_event.is_set():
                 self.heartbeat_plc.client.Write(tag, int(value))
-                time.sleep(s)
+                self.stop_event.wait(s)
                 value = not value  # Toggle value
         except KeyboardInterrupt:
             print("Child process interrupted and stopping...")
@@ -156,30 +387,56 @@ class VibrationMonitor:
         sampling_thread = threading.Thread(target=self.sampling_task, daemon=True)
         rms_thread = threading.Thread(target=self.rms_and_plc_task, daemon=True)
         saving_thread = threading.Thread(target=self.data_saving_task, daemon=True)
+        decimation_thread = threading.Thread(target=self.decimation_task, daemon=True)
+        spectrum_thread = threading.Thread(target=self.spectrum_task, daemon=True)
+        orders_thread = threading.Thread(target=self.order_tracking_task, daemon=True)
         heartbeat_thread = threading.Thread(target=self.heartbeat_task, daemon=True)  
         heartbeat_thread.start()
 
         self.plc.wait_for_plc()
 
+        # Consumers of the sampled data, joined on shutdown after the sampler
+        self.sampling_thread = sampling_thread
+        self.consumer_threads = [rms_thread, saving_thread]
+        if self.decimation_factors:
+            self.consumer_threads.append(decimation_thread)
+        if self.spectrum_enabled:
+            self.consumer_threads.append(spectrum_thread)
+        if self.orders_enabled:
+            self.consumer_threads.append(orders_thread)
+            self.frequency_watcher.start()
         sampling_thread.start()
-        rms_thread.start()
-        saving_thread.start()
-        
+        for thread in self.consumer_threads:
+            thread.start()
+
+        self.status_watcher.start()
         start_time = time.time()
         try:
-            while True:
-                if self.is_logging:
-                    self.check_if_running()
-                else:
-                    print("⛔ Shutting down...")
-                    self.sensor.stop()
-                    break
-
+            # Woken by the status watcher once the VDF stops
+            while not self.stop_event.wait(0.5):
+                pass
+            self.shutdown()
             print(f"✅ Test finished, duration: {time.time() - start_time:.2f} seconds.")
             
         except KeyboardInterrupt:
-            print("⛔ Shutting down...")
-            self.sensor.stop()
+            self.shutdown()
+
+    def shutdown(self):
+        print("⛔ Shutting down...")
+        self.stop_event.set()
+        self.status_watcher.stop()
+        self.frequency_watcher.stop()
+        # The sampler puts its last partial block in the ring, then the consumers go through
+        # what is left (the saving task writes it and closes the recording)
+        if self.sampling_thread is not None:
+            self.sampling_thread.join()
+        self.sensor.stop()
+        deadline = time.monotonic() + CONFIG["SHUTDOWN_TIMEOUT"]
+        for thread in self.consumer_threads:
+            thread.join(max(deadline - time.monotonic(), 0))
+            if thread.is_alive():
+                print(f"⚠️ {thread.name} did not finish within {CONFIG['SHUTDOWN_TIMEOUT']} s")
+        self.plc.stop_publisher()
 
 
 # --- Main Execution ---